@@ -1,9 +1,10 @@
+import functools
+import inspect
+import struct
 import sys
 import types
 import typing as t
 
-import decorator as deco
-
 from gssapi.raw.misc import GSSError
 
 if t.TYPE_CHECKING:
@@ -45,6 +46,10 @@ def inquire_property(
     :python:`_inquire` method, and return the value of the
     requested information.
 
+    Once the security context is complete, the information no longer
+    changes, so all of it is inquired about once and kept in a snapshot
+    which serves all subsequent accesses.
+
     Args:
         name (str): the name of the 'inquire' result information
 
@@ -58,7 +63,15 @@ def inquire_property(
                    "establishment has not yet been started.")
             raise AttributeError(msg)
 
-        return getattr(self._inquire(**{name: True}), name)
+        snapshot = self._snapshot
+        if snapshot is None:
+            if not self.complete:
+                # the context may still change, so just ask for this field
+                return getattr(self._inquire(**{name: True}), name)
+
+            snapshot = self._take_snapshot()
+
+        return getattr(snapshot, name)
 
     return property(inquire_property, doc=doc)
 
@@ -108,14 +121,101 @@ def _encode_dict(
     return {enc(k): enc(v) for k, v in d.items()}
 
 
+# the buffer-protocol objects accepted by the message methods
+_BytesLike = t.Union[bytes, bytearray, memoryview]
+
+# any byte source accepted by the streaming helpers: a buffer-protocol object
+# (including mmap), a binary file-like object, or an iterable of such buffers
+_ByteSource = t.Union[_BytesLike, t.BinaryIO, t.Iterable[_BytesLike]]
+
+# the length prefix used to frame wrapped messages in a byte stream
+_FRAME_HEADER = struct.Struct('>I')
+
+
+def _iter_chunks(
+    source: _ByteSource,
+    chunk_size: int,
+) -> t.Iterator[t.Union[bytes, memoryview]]:
+    """Splits a byte source into chunks of at most `chunk_size` bytes
+
+    Buffer-protocol sources (including :class:`mmap.mmap` objects) are
+    sliced without copying, and file-like sources are read one chunk at a
+    time, so only a single chunk needs to be resident at any point.
+
+    Note:
+        Chunks read from a file-like object with `readinto` share a single
+        buffer, so each chunk must be consumed before requesting the next.
+    """
+
+    try:
+        pieces: t.Iterable = [memoryview(source)]  # type: ignore[arg-type]
+    except TypeError:
+        readinto = getattr(source, 'readinto', None)
+        read = getattr(source, 'read', None)
+        if readinto is not None:
+            buf = memoryview(bytearray(chunk_size))
+            while True:
+                length = readinto(buf)
+                if not length:
+                    return
+                yield buf[:length]
+        elif read is not None:
+            while True:
+                chunk = read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        else:
+            pieces = t.cast(t.Iterable, source)
+
+    for piece in pieces:
+        view = memoryview(piece).cast('B')
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+
+
+def _iter_frames(
+    source: _ByteSource,
+    max_frame_size: int,
+) -> t.Iterator[bytes]:
+    """Splits a stream of length-prefixed frames back into the frames
+
+    Frames are expected to be prefixed with their length as per
+    :python:`_FRAME_HEADER`.  Frames larger than `max_frame_size`
+    are rejected so that memory use stays bounded.
+
+    Raises:
+        ValueError: the stream was malformed or truncated
+    """
+
+    header_size = _FRAME_HEADER.size
+    buf = bytearray()
+    for chunk in _iter_chunks(source, max_frame_size + header_size):
+        buf += chunk
+        while len(buf) >= header_size:
+            (length,) = _FRAME_HEADER.unpack_from(buf)
+            if length > max_frame_size:
+                raise ValueError(f"Frame of {length} bytes exceeds the "
+                                 f"maximum size of {max_frame_size} bytes")
+
+            end = header_size + length
+            if len(buf) < end:
+                break
+
+            yield bytes(buf[header_size:end])
+            del buf[:end]
+
+    if buf:
+        raise ValueError("The stream ended in the middle of a frame")
+
+
+_F = t.TypeVar('_F', bound=t.Callable[..., t.Any])
+
+
 # in case of Python 3, just use exception chaining
-@deco.decorator
 def catch_and_return_token(
-    func: t.Callable,
-    self: "SecurityContext",
-    *args: t.Any,
-    **kwargs: t.Any,
-) -> t.Optional[bytes]:
+    func: _F,
+) -> _F:
     """Optionally defer exceptions and return a token instead
 
     When `__DEFER_STEP_ERRORS__` is set on the implementing class
@@ -127,43 +227,78 @@ def catch_and_return_token(
     (and :python:`_last_tb` when Python 2 is in use).
     """
 
+    @functools.wraps(func)
+    def catch_and_return_token(
+        self: "SecurityContext",
+        *args: t.Any,
+        **kwargs: t.Any,
+    ) -> t.Optional[bytes]:
+        try:
+            return func(self, *args, **kwargs)
+        except GSSError as e:
+            defer_step_errors = getattr(self, '__DEFER_STEP_ERRORS__', False)
+            if e.token is not None and defer_step_errors:
+                self._last_err = e
+                # skip the "return func" line above in the traceback
+                tb = e.__traceback__.tb_next  # type: ignore[union-attr]
+                self._last_err.__traceback__ = tb
+
+                return e.token
+            else:
+                raise
+
+    return t.cast(_F, catch_and_return_token)
+
+
+def _raise_last_err(
+    self: "SecurityContext",
+) -> t.NoReturn:
     try:
-        return func(self, *args, **kwargs)
-    except GSSError as e:
-        defer_step_errors = getattr(self, '__DEFER_STEP_ERRORS__', False)
-        if e.token is not None and defer_step_errors:
-            self._last_err = e
-            # skip the "return func" line above in the traceback
-            tb = e.__traceback__.tb_next  # type: ignore[union-attr]
-            self._last_err.__traceback__ = tb
-
-            return e.token
-        else:
-            raise
+        raise self._last_err  # type: ignore[misc]
+    finally:
+        self._last_err = None
 
 
-@deco.decorator
 def check_last_err(
-    func: t.Callable,
-    self: "SecurityContext",
-    *args: t.Any,
-    **kwargs: t.Any,
-) -> t.Any:
+    func: _F,
+) -> _F:
     """Check and raise deferred errors before running the function
 
     This method checks :python:`_last_err` before running the wrapped
     function.  If present and not None, the exception will be raised
     with its original traceback.
+
+    The check is made in a plain wrapper function, so the common case of
+    there being no deferred error only costs a single extra call.
     """
 
-    if self._last_err is not None:
-        try:
-            raise self._last_err
-        finally:
-            self._last_err = None
-    else:
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def check_last_err_async(
+            self: "SecurityContext",
+            *args: t.Any,
+            **kwargs: t.Any,
+        ) -> t.Any:
+            if self._last_err is not None:
+                _raise_last_err(self)
+
+            return await func(self, *args, **kwargs)
+
+        return t.cast(_F, check_last_err_async)
+
+    @functools.wraps(func)
+    def check_last_err(
+        self: "SecurityContext",
+        *args: t.Any,
+        **kwargs: t.Any,
+    ) -> t.Any:
+        if self._last_err is not None:
+            _raise_last_err(self)
+
         return func(self, *args, **kwargs)
 
+    return t.cast(_F, check_last_err)
+
 
 class CheckLastError(type):
     """Check for a deferred error on all methods
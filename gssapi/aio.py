@@ -0,0 +1,515 @@
+"""Asyncio Integration
+
+This module provides an :mod:`asyncio` protocol and transport pair which
+establish a security context over a stream connection and then encrypt
+and decrypt everything written to and read from it.
+
+All tokens exchanged on the connection, both during the handshake and
+afterwards, are framed with a 4-byte big-endian length prefix, the same
+framing used by :meth:`SecurityContext.encrypt_stream
+<gssapi.sec_contexts.SecurityContext.encrypt_stream>`.
+
+Handshake steps which may need to talk to the KDC are run in an executor so
+that they do not block the event loop, while the rest are run directly in
+the event loop (see :meth:`SecurityContext.astep
+<gssapi.sec_contexts.SecurityContext.astep>`).  Once the context is
+established, all the data written during a single iteration of the event
+loop is encrypted with a single batched call, and all the complete frames
+received at once are decrypted with a single batched call.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import typing as t
+
+import gssapi.exceptions as excs
+from gssapi import _utils
+from gssapi.raw.misc import GSSError
+from gssapi.sec_contexts import SecurityContext
+
+
+class SecureTransport(asyncio.Transport):
+    """A transport which encrypts data written to it
+
+    This is the transport passed to the application protocol by
+    :class:`SecureProtocol` once the security context has been established.
+    Data written to it is queued and encrypted in a batch at the next
+    iteration of the event loop.
+
+    The established security context is available as the
+    ``'security_context'`` extra info key.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        protocol: "SecureProtocol",
+    ) -> None:
+        super(SecureTransport, self).__init__()
+
+        self._loop = loop
+        self._protocol = protocol
+        self._pending: t.List[bytes] = []
+        self._pending_size = 0
+        self._flush_handle: t.Optional[asyncio.Handle] = None
+        self._closing = False
+
+    def get_extra_info(
+        self,
+        name: str,
+        default: t.Any = None,
+    ) -> t.Any:
+        if name == 'security_context':
+            return self._protocol.context
+
+        return self._protocol._transport.get_extra_info(name, default)
+
+    def set_protocol(
+        self,
+        protocol: asyncio.BaseProtocol,
+    ) -> None:
+        self._protocol._app_protocol = t.cast(asyncio.Protocol, protocol)
+
+    def get_protocol(self) -> asyncio.BaseProtocol:
+        return self._protocol._app_protocol
+
+    def is_closing(self) -> bool:
+        return self._closing or self._protocol._transport.is_closing()
+
+    def close(self) -> None:
+        if self._closing:
+            return
+
+        self._closing = True
+        self._flush()
+        self._protocol._transport.close()
+
+    def abort(self) -> None:
+        self._closing = True
+        self._discard_pending()
+        self._protocol._transport.abort()
+
+    def is_reading(self) -> bool:
+        return self._protocol._transport.is_reading()
+
+    def pause_reading(self) -> None:
+        self._protocol._transport.pause_reading()
+
+    def resume_reading(self) -> None:
+        self._protocol._transport.resume_reading()
+
+    def set_write_buffer_limits(
+        self,
+        high: t.Optional[int] = None,
+        low: t.Optional[int] = None,
+    ) -> None:
+        self._protocol._transport.set_write_buffer_limits(high, low)
+
+    def get_write_buffer_limits(self) -> t.Tuple[int, int]:
+        return self._protocol._transport.get_write_buffer_limits()
+
+    def get_write_buffer_size(self) -> int:
+        return (self._pending_size +
+                self._protocol._transport.get_write_buffer_size())
+
+    def write(
+        self,
+        data: t.Union[bytes, bytearray, memoryview],
+    ) -> None:
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError("data: expecting a bytes-like instance, "
+                            f"got {type(data).__name__}")
+
+        if self._closing:
+            raise RuntimeError("Cannot write to a closing transport")
+
+        if not data:
+            return
+
+        self._pending.append(bytes(data))
+        self._pending_size += len(data)
+
+        # encrypt everything written during this iteration of the loop
+        # in one go
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_soon(self._flush)
+
+    def can_write_eof(self) -> bool:
+        return self._protocol._transport.can_write_eof()
+
+    def write_eof(self) -> None:
+        self._flush()
+        self._protocol._transport.write_eof()
+
+    def _discard_pending(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self._pending = []
+        self._pending_size = 0
+
+    def _flush(self) -> None:
+        pending = self._pending
+        self._discard_pending()
+
+        if pending:
+            self._protocol._send_data(b''.join(pending))
+
+
+class SecureProtocol(asyncio.Protocol):
+    """A protocol which establishes a security context over a connection
+
+    This protocol sits between a stream transport and an application
+    protocol.  It performs the security context handshake when the
+    connection is made, and then calls the application protocol's
+    :meth:`~asyncio.BaseProtocol.connection_made` with a
+    :class:`SecureTransport`, through which all data is transparently
+    encrypted and decrypted.
+
+    If the handshake fails, the connection is closed and the application
+    protocol is never notified; the error is instead set on the
+    :attr:`handshake_complete` future.
+    """
+
+    def __init__(
+        self,
+        context: SecurityContext,
+        app_protocol: asyncio.Protocol,
+        executor: t.Optional[concurrent.futures.Executor] = None,
+        max_token_size: int = 65536,
+    ) -> None:
+        """
+        Args:
+            context (SecurityContext): a new, unestablished security context,
+                which determines whether this end initiates or accepts
+            app_protocol (asyncio.Protocol): the protocol to hand the
+                decrypted data to
+            executor (concurrent.futures.Executor): the executor to run
+                blocking handshake steps in, or None to use the event loop's
+                default executor
+            max_token_size (int): the maximum size of each token sent or
+                received, not including its length prefix
+        """
+
+        self.context = context
+        self.executor = executor
+        self.max_token_size = max_token_size
+
+        self._app_protocol = app_protocol
+        self._loop = asyncio.get_event_loop()
+        self._transport: asyncio.Transport
+        self._app_transport: t.Optional[SecureTransport] = None
+        self._handshake_task: t.Optional[asyncio.Task] = None
+
+        self._buffer = bytearray()
+        self._frames: t.Deque[bytes] = collections.deque()
+        self._frame_waiter: t.Optional[asyncio.Future] = None
+        self._eof = False
+        self._error: t.Optional[Exception] = None
+
+        self.handshake_complete: asyncio.Future = self._loop.create_future()
+        # nobody waits on this for server connections, so don't complain
+        # about handshake errors which were never retrieved
+        self.handshake_complete.add_done_callback(
+            lambda fut: fut.cancelled() or fut.exception())
+
+    def connection_made(
+        self,
+        transport: asyncio.BaseTransport,
+    ) -> None:
+        self._transport = t.cast(asyncio.Transport, transport)
+        self._handshake_task = self._loop.create_task(self._handshake())
+
+    def connection_lost(
+        self,
+        exc: t.Optional[Exception],
+    ) -> None:
+        if exc is None:
+            exc = self._error
+
+        if self._app_transport is not None:
+            self._app_transport._closing = True
+            self._app_transport._discard_pending()
+            self._loop.call_soon(self._app_protocol.connection_lost, exc)
+        else:
+            if exc is None:
+                exc = ConnectionResetError("Connection lost during the "
+                                           "security context handshake")
+            self._fail_handshake(exc)
+
+    def pause_writing(self) -> None:
+        if self._app_transport is not None:
+            self._app_protocol.pause_writing()
+
+    def resume_writing(self) -> None:
+        if self._app_transport is not None:
+            self._app_protocol.resume_writing()
+
+    def data_received(
+        self,
+        data: bytes,
+    ) -> None:
+        self._buffer += data
+
+        header_size = _utils._FRAME_HEADER.size
+        frames = []
+        while len(self._buffer) >= header_size:
+            (length,) = _utils._FRAME_HEADER.unpack_from(self._buffer)
+            if length > self.max_token_size:
+                self._abort(ValueError(f"Received a {length} byte token, "
+                                       "which is larger than the maximum "
+                                       f"of {self.max_token_size} bytes"))
+                return
+
+            end = header_size + length
+            if len(self._buffer) < end:
+                break
+
+            frames.append(bytes(self._buffer[header_size:end]))
+            del self._buffer[:end]
+
+        if not frames:
+            return
+
+        if self._app_transport is not None:
+            self._receive_data(frames)
+        else:
+            self._frames.extend(frames)
+            self._wake_frame_waiter()
+
+    def eof_received(self) -> t.Optional[bool]:
+        if self._app_transport is not None:
+            return self._app_protocol.eof_received()
+
+        self._eof = True
+        self._wake_frame_waiter()
+        return None
+
+    async def _next_frame(self) -> bytes:
+        while not self._frames:
+            if self._eof:
+                raise ConnectionResetError("Connection closed during the "
+                                           "security context handshake")
+
+            self._frame_waiter = self._loop.create_future()
+            await self._frame_waiter
+
+        return self._frames.popleft()
+
+    def _wake_frame_waiter(self) -> None:
+        if self._frame_waiter is not None and not self._frame_waiter.done():
+            self._frame_waiter.set_result(None)
+
+    async def _handshake(self) -> None:
+        try:
+            if self.context.usage == 'initiate':
+                token = await self.context.astep(None, self.executor)
+                self._send_frames([token])
+
+            while not self.context.complete:
+                token = await self.context.astep(await self._next_frame(),
+                                                 self.executor)
+                if token:
+                    self._send_frames([token])
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._abort(exc)
+            return
+
+        self._app_transport = SecureTransport(self._loop, self)
+        self._app_protocol.connection_made(self._app_transport)
+        if not self.handshake_complete.done():
+            self.handshake_complete.set_result(None)
+
+        # anything which arrived right behind the last handshake token
+        # is application data
+        if self._frames:
+            frames = list(self._frames)
+            self._frames.clear()
+            self._receive_data(frames)
+
+    def _fail_handshake(
+        self,
+        exc: Exception,
+    ) -> None:
+        task = self._handshake_task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+        if not self.handshake_complete.done():
+            self.handshake_complete.set_exception(exc)
+
+    def _abort(
+        self,
+        exc: Exception,
+    ) -> None:
+        if self._error is None:
+            self._error = exc
+
+        if self._app_transport is None:
+            self._fail_handshake(exc)
+
+        self._transport.abort()
+
+    def _send_frames(
+        self,
+        tokens: t.Iterable[t.Optional[bytes]],
+    ) -> None:
+        parts = []
+        for token in tokens:
+            token = token or b''
+            parts.append(_utils._FRAME_HEADER.pack(len(token)))
+            parts.append(token)
+
+        self._transport.writelines(parts)
+
+    def _send_data(
+        self,
+        data: _utils._BytesLike,
+    ) -> None:
+        chunk_size = self.context.get_wrap_size_limit(self.max_token_size)
+        view = memoryview(data)
+        chunks = [view[i:i + chunk_size]
+                  for i in range(0, len(view), chunk_size)]
+
+        tokens = []
+        for res in self.context.wrap_many(chunks, True):
+            if isinstance(res, GSSError):
+                self._abort(res)
+                return
+            if not res.encrypted:
+                self._abort(excs.EncryptionNotUsed("Wrapped message was not "
+                                                   "encrypted"))
+                return
+
+            tokens.append(res.message)
+
+        self._send_frames(tokens)
+
+    def _receive_data(
+        self,
+        frames: t.List[bytes],
+    ) -> None:
+        parts = []
+        for res in self.context.unwrap_many(frames):
+            if isinstance(res, GSSError):
+                self._abort(res)
+                return
+            if not res.encrypted:
+                self._abort(excs.EncryptionNotUsed("The unwrapped message "
+                                                   "was not encrypted"))
+                return
+
+            parts.append(res.message)
+
+        self._app_protocol.data_received(b''.join(parts))
+
+
+async def create_connection(
+    protocol_factory: t.Callable[[], asyncio.Protocol],
+    host: t.Optional[str] = None,
+    port: t.Optional[int] = None,
+    *,
+    context: SecurityContext,
+    executor: t.Optional[concurrent.futures.Executor] = None,
+    max_token_size: int = 65536,
+    **kwargs: t.Any,
+) -> t.Tuple[SecureTransport, asyncio.Protocol]:
+    """Open a connection and establish a security context over it
+
+    This works like :meth:`asyncio.loop.create_connection`, except that it
+    only returns once the security context has been established, and the
+    returned transport encrypts and decrypts all data.
+
+    Args:
+        protocol_factory (callable): a callable returning the application
+            protocol
+        host (str): the host to connect to
+        port (int): the port to connect to
+        context (SecurityContext): a new initiating security context
+        executor (concurrent.futures.Executor): the executor to run
+            blocking handshake steps in, or None to use the event loop's
+            default executor
+        max_token_size (int): the maximum size of each token sent or
+            received, not including its length prefix
+        **kwargs: any other arguments to pass to
+            :meth:`asyncio.loop.create_connection`
+
+    Returns:
+        tuple: the :class:`SecureTransport` and the application protocol
+
+    Raises:
+        ~gssapi.exceptions.GSSError: the security context could not be
+            established
+    """
+
+    loop = asyncio.get_running_loop()
+    app_protocol = protocol_factory()
+
+    transport, protocol = await loop.create_connection(
+        lambda: SecureProtocol(context, app_protocol, executor=executor,
+                               max_token_size=max_token_size),
+        host, port, **kwargs)  # type: ignore[arg-type]
+
+    try:
+        await protocol.handshake_complete
+    except BaseException:
+        transport.close()
+        raise
+
+    return t.cast(SecureTransport, protocol._app_transport), app_protocol
+
+
+async def create_server(
+    protocol_factory: t.Callable[[], asyncio.Protocol],
+    host: t.Optional[str] = None,
+    port: t.Optional[int] = None,
+    *,
+    context_factory: t.Optional[t.Callable[[], SecurityContext]] = None,
+    executor: t.Optional[concurrent.futures.Executor] = None,
+    max_token_size: int = 65536,
+    **kwargs: t.Any,
+) -> asyncio.AbstractServer:
+    """Start a server which establishes a security context per connection
+
+    This works like :meth:`asyncio.loop.create_server`, except that the
+    application protocol for each connection is only connected once a
+    security context has been established with the client, and receives a
+    :class:`SecureTransport` which encrypts and decrypts all data.
+
+    Args:
+        protocol_factory (callable): a callable returning the application
+            protocol for each connection
+        host (str): the host to listen on
+        port (int): the port to listen on
+        context_factory (callable): a callable returning a new accepting
+            security context for each connection, or None to accept with
+            the default credentials
+        executor (concurrent.futures.Executor): the executor to run
+            blocking handshake steps in, or None to use the event loop's
+            default executor
+        max_token_size (int): the maximum size of each token sent or
+            received, not including its length prefix
+        **kwargs: any other arguments to pass to
+            :meth:`asyncio.loop.create_server`
+
+    Returns:
+        asyncio.AbstractServer: the server
+    """
+
+    loop = asyncio.get_running_loop()
+
+    def new_context() -> SecurityContext:
+        if context_factory is None:
+            return SecurityContext(usage='accept')
+        return context_factory()
+
+    def factory() -> SecureProtocol:
+        return SecureProtocol(new_context(), protocol_factory(),
+                              executor=executor,
+                              max_token_size=max_token_size)
+
+    return await loop.create_server(factory, host, port, **kwargs)
@@ -1,3 +1,7 @@
+import collections
+import os
+import threading
+import time
 import typing as t
 
 from gssapi.raw import creds as rcreds
@@ -48,7 +52,14 @@ class Credentials(rcreds.Creds):
         ~gssapi.exceptions.MissingCredentialsError
     """
 
-    __slots__ = ()
+    # when the credentials expire (see `expires_at`), as recorded when they
+    # were acquired or last inquired about, and the last full inquire result
+    # (see `info`)
+    __slots__ = ('_expires_at', '_expiry_known', '_info')
+
+    _expires_at: t.Optional[float]
+    _expiry_known: bool
+    _info: t.Optional[tuples.InquireCredResult]
 
     def __new__(
         cls,
@@ -74,19 +85,55 @@ class Credentials(rcreds.Creds):
 
             base_creds = rcred_imp_exp.import_cred(token)
         else:
+            # acquire already returns an instance of this class, which may
+            # be shared through the acquire cache, so its handle must not be
+            # taken over here
             res = cls.acquire(name, lifetime, mechs, usage,
                               store=store)
-            base_creds = res.creds
+            return t.cast("Credentials", res.creds)
+
+        creds = t.cast("Credentials",
+                       super(Credentials, cls).__new__(cls, base_creds))
+
+        creds._expires_at = None
+        creds._expiry_known = False
+        creds._info = None
 
-        return t.cast("Credentials",
-                      super(Credentials, cls).__new__(cls, base_creds))
+        return creds
+
+    @property
+    def info(self) -> tuples.InquireCredResult:
+        """Information about these credentials
+
+        This is fetched with a single call to :meth:`inquire` the first
+        time it is needed (or by :meth:`refresh_info`), and then reused by
+        :attr:`name`, :attr:`usage` and :attr:`mechs`.  Its lifetime is
+        updated whenever :attr:`lifetime` is read.
+        """
+        info = self._info
+        if info is None:
+            info = self.refresh_info()
+
+        return info
+
+    def refresh_info(self) -> tuples.InquireCredResult:
+        """Fetch the information in :attr:`info` from GSSAPI again
+
+        Returns:
+            InquireCredResult: the new value of :attr:`info`
+
+        Raises:
+            ~gssapi.exceptions.MissingCredentialsError
+            ~gssapi.exceptions.InvalidCredentialsError
+            ~gssapi.exceptions.ExpiredCredentialsError
+        """
+
+        return self.inquire()
 
     @property
     def name(self) -> names.Name:
         """Get the name associated with these credentials"""
-        return t.cast(names.Name,
-                      self.inquire(name=True, lifetime=False, usage=False,
-                                   mechs=False).name)
+        return t.cast(names.Name, self.info.name)
 
     @property
     def lifetime(self) -> int:
@@ -95,19 +142,77 @@ class Credentials(rcreds.Creds):
                       self.inquire(name=False, lifetime=True,
                                    usage=False, mechs=False).lifetime)
 
+    @property
+    def expires_at(self) -> t.Optional[float]:
+        """When these credentials expire, as a :func:`time.monotonic` timestamp
+
+        This is recorded when the credentials are acquired (and whenever
+        their lifetime is inquired about), so reading it doesn't involve any
+        calls into GSSAPI.  If it isn't known yet (for instance, for imported
+        credentials), it is fetched as per :meth:`refresh_expiry`.  It is
+        None if the credentials never expire.
+        """
+        if not self._expiry_known:
+            return self.refresh_expiry()
+
+        return self._expires_at
+
+    def is_expiring(
+        self,
+        within: float = 0,
+    ) -> bool:
+        """Check whether these credentials expire within a given time
+
+        This uses :attr:`expires_at`, and so doesn't usually involve any
+        calls into GSSAPI.
+
+        Args:
+            within (float): the number of seconds from now to check
+
+        Returns:
+            bool: whether the credentials will have expired `within` seconds
+            from now
+        """
+
+        expires_at = self.expires_at
+        return (expires_at is not None and
+                expires_at - time.monotonic() <= within)
+
+    def refresh_expiry(self) -> t.Optional[float]:
+        """Fetch when these credentials expire from GSSAPI
+
+        Returns:
+            float: the new value of :attr:`expires_at`
+
+        Raises:
+            ~gssapi.exceptions.MissingCredentialsError
+            ~gssapi.exceptions.InvalidCredentialsError
+            ~gssapi.exceptions.ExpiredCredentialsError
+        """
+
+        self.inquire(name=False, lifetime=True, usage=False, mechs=False)
+        return self._expires_at
+
+    def _set_expiry(
+        self,
+        lifetime: t.Optional[int],
+    ) -> None:
+        if lifetime is None:
+            self._expires_at = None
+        else:
+            self._expires_at = time.monotonic() + lifetime
+
+        self._expiry_known = True
+
     @property
     def mechs(self) -> t.Set[roids.OID]:
         """Get the mechanisms for these credentials"""
-        return t.cast(t.Set[roids.OID],
-                      self.inquire(name=False, lifetime=False,
-                                   usage=False, mechs=True).mechs)
+        return t.cast(t.Set[roids.OID], self.info.mechs)
 
     @property
     def usage(self) -> str:
         """Get the usage (initiate, accept, or both) of these credentials"""
-        return t.cast(str,
-                      self.inquire(name=False, lifetime=False,
-                                   usage=True, mechs=False).usage)
+        return t.cast(str, self.info.usage)
 
     @classmethod
     def acquire(
@@ -159,6 +264,15 @@ class Credentials(rcreds.Creds):
             ~gssapi.exceptions.MissingCredentialsError
         """
 
+        cache = _acquire_cache
+        if cache is not None:
+            mechs = list(mechs) if mechs is not None else None
+            key = ((cls,) + _cred_key(name, lifetime, mechs, usage, store) +
+                   (_default_sources(),))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
         if store is None:
             res = rcreds.acquire_cred(name, lifetime,
                                       mechs, usage)
@@ -174,8 +288,13 @@ class Credentials(rcreds.Creds):
                                                      lifetime, mechs,
                                                      usage)
 
-        return tuples.AcquireCredResult(cls(base=res.creds), res.mechs,
-                                        res.lifetime)
+        creds = cls(base=res.creds)
+        creds._set_expiry(res.lifetime)
+
+        if cache is not None:
+            cache.put(key, creds, res.mechs)
+
+        return tuples.AcquireCredResult(creds, res.mechs, res.lifetime)
 
     def store(
         self,
@@ -304,14 +423,25 @@ class Credentials(rcreds.Creds):
 
         res = rcreds.inquire_cred(self, name, lifetime, usage, mechs)
 
+        if lifetime:
+            self._set_expiry(res.lifetime)
+
         if res.name is not None:
             res_name = names.Name(res.name)
         else:
             res_name = None
 
-        return tuples.InquireCredResult(res_name, res.lifetime,
+        info = tuples.InquireCredResult(res_name, res.lifetime,
                                         res.usage, res.mechs)
 
+        # keep `info` up to date with whatever was fetched
+        if name and lifetime and usage and mechs:
+            self._info = info
+        elif lifetime and self._info is not None:
+            self._info = self._info._replace(lifetime=res.lifetime)
+
+        return info
+
     def inquire_by_mech(
         self,
         mech: roids.OID,
@@ -474,3 +604,420 @@ class Credentials(rcreds.Creds):
     ) -> t.Tuple[t.Type["Credentials"], t.Tuple[None, bytes]]:
         # the unpickle arguments to new are (base=None, token=self.export())
         return (type(self), (None, self.export()))
+
+
+# (name, name type, lifetime, mechs, usage, store)
+_CredKey = t.Tuple[t.Optional[bytes], t.Optional[roids.OID], t.Optional[int],
+                   t.Optional[t.Tuple[roids.OID, ...]], str,
+                   t.Optional[t.Tuple[t.Tuple[bytes, bytes], ...]]]
+
+
+def _cred_key(
+    name: t.Optional[rnames.Name],
+    lifetime: t.Optional[int],
+    mechs: t.Optional[t.List[roids.OID]],
+    usage: str,
+    store: t.Optional[t.Dict[t.Union[bytes, str], t.Union[bytes, str]]],
+) -> _CredKey:
+    name_key: t.Optional[bytes] = None
+    name_type: t.Optional[roids.OID] = None
+    if name is not None:
+        # NB: don't wrap the name in a high-level Name, which would take
+        # over its handle
+        displ_name = rnames.display_name(name, name_type=True)
+        name_key = displ_name.name
+        name_type = displ_name.name_type
+
+    return (name_key, name_type, lifetime,
+            tuple(mechs) if mechs is not None else None, usage,
+            tuple(sorted(_encode_dict(store).items()))
+            if store is not None else None)
+
+
+# the environment variables which select the default credential sources
+_DEFAULT_SOURCE_VARS = ('KRB5CCNAME', 'KRB5_CLIENT_KTNAME', 'KRB5_KTNAME')
+
+
+def _default_sources() -> t.Tuple[t.Optional[str], ...]:
+    # credentials acquired without a name (or from a store which doesn't
+    # name every source) come from the default sources, so these are part
+    # of the acquire cache keys
+    return tuple(os.environ.get(var) for var in _DEFAULT_SOURCE_VARS)
+
+
+class _AcquireCache:
+    # an LRU cache of acquired credentials, keyed by the credentials class
+    # and the acquire arguments
+    def __init__(
+        self,
+        max_size: int,
+        min_lifetime: float,
+    ) -> None:
+        self.max_size = max_size
+        self.min_lifetime = min_lifetime
+
+        self._lock = threading.Lock()
+        self._entries: t.OrderedDict[
+            t.Tuple[t.Any, ...], t.Tuple[Credentials, t.Set[roids.OID]]
+        ] = collections.OrderedDict()
+
+    def get(
+        self,
+        key: t.Tuple[t.Any, ...],
+    ) -> t.Optional[tuples.AcquireCredResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            creds, mechs = entry
+            if creds.is_expiring(self.min_lifetime):
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        # the lifetime is None for credentials which never expire, as it is
+        # when they are first acquired
+        expires_at = creds.expires_at
+        lifetime = (int(expires_at - time.monotonic())
+                    if expires_at is not None else None)
+        return tuples.AcquireCredResult(creds, mechs,
+                                        t.cast(int, lifetime))
+
+    def put(
+        self,
+        key: t.Tuple[t.Any, ...],
+        creds: Credentials,
+        mechs: t.Set[roids.OID],
+    ) -> None:
+        with self._lock:
+            self._entries[key] = (creds, mechs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(
+        self,
+        name: t.Optional[rnames.Name],
+        usage: t.Optional[str],
+    ) -> None:
+        name_key = _cred_key(name, None, None, 'both', None)[:2]
+        with self._lock:
+            for key in list(self._entries):
+                # keys are (cls, name, name type, lifetime, mechs, usage,
+                # store, default sources)
+                if name is not None and key[1:3] != name_key:
+                    continue
+                if usage is not None and key[5] != usage:
+                    continue
+
+                del self._entries[key]
+
+
+_acquire_cache: t.Optional[_AcquireCache] = None
+
+
+def enable_acquire_cache(
+    max_size: int = 128,
+    min_lifetime: float = 60,
+) -> None:
+    """Cache credentials acquired through :meth:`Credentials.acquire`
+
+    Once enabled, acquiring credentials with the same arguments (name,
+    lifetime, mechanisms, usage and credential store) returns the same
+    :class:`Credentials` object, without calling into GSSAPI, until the
+    credentials have less than `min_lifetime` seconds left.  At most
+    `max_size` sets of credentials are cached, with the least recently used
+    ones being evicted first.  This also applies to credentials acquired by
+    constructing :class:`Credentials` directly.
+
+    The default credential sources selected by the ``KRB5CCNAME``,
+    ``KRB5_CLIENT_KTNAME`` and ``KRB5_KTNAME`` environment variables are
+    part of the cache key, so changing them is taken into account.  The
+    default credentials cache set with
+    :func:`~gssapi.raw.ext_krb5.krb5_ccache_name` can't be checked, however,
+    so :func:`invalidate_acquire_cache` should be called after changing it.
+
+    Since cached credentials are shared, they must not be passed as the
+    `base` argument of the :class:`Credentials` constructor (or the
+    low-level :class:`~gssapi.raw.creds.Creds` constructor), which takes
+    over their underlying handle.
+
+    Calling this again replaces the cache with an empty one.
+
+    Args:
+        max_size (int): the maximum number of sets of credentials to cache
+        min_lifetime (float): the minimum remaining lifetime, in seconds, of
+            cached credentials which are returned
+    """
+
+    global _acquire_cache
+    _acquire_cache = _AcquireCache(max_size, min_lifetime)
+
+
+def disable_acquire_cache() -> None:
+    """Stop caching acquired credentials, and drop any cached credentials"""
+
+    global _acquire_cache
+    _acquire_cache = None
+
+
+def invalidate_acquire_cache(
+    name: t.Optional[rnames.Name] = None,
+    usage: t.Optional[str] = None,
+) -> None:
+    """Drop cached credentials, so that they are acquired again
+
+    This does nothing if the acquire cache is not enabled.
+
+    Args:
+        name (~gssapi.names.Name): only drop credentials acquired for this
+            name, or None for any name
+        usage (str): only drop credentials acquired with this usage, or None
+            for any usage
+    """
+
+    cache = _acquire_cache
+    if cache is not None:
+        cache.invalidate(name, usage)
+
+
+class _ManagedCredentials:
+    __slots__ = ('creds', 'name', 'lifetime', 'mechs', 'usage', 'store',
+                 'renew_at')
+
+    def __init__(
+        self,
+        name: t.Optional[rnames.Name],
+        lifetime: t.Optional[int],
+        mechs: t.Optional[t.List[roids.OID]],
+        usage: str,
+        store: t.Optional[t.Dict[t.Union[bytes, str], t.Union[bytes, str]]],
+    ) -> None:
+        self.name = name
+        self.lifetime = lifetime
+        self.mechs = mechs
+        self.usage = usage
+        self.store = store
+        self.creds: t.Optional[Credentials] = None
+        self.renew_at: t.Optional[float] = None
+
+
+class CredentialManager:
+    """Keeps a set of credentials acquired and renewed in the background
+
+    Credentials are kept per name, usage, mechanisms and credential store.
+    The first call to :meth:`get` for a given set of credentials acquires
+    them, and afterwards a background thread acquires them again once
+    `renew_fraction` of their remaining lifetime has passed, so that
+    :meth:`get` returns the current credentials without calling into GSSAPI.
+
+    GSSAPI has no way of renewing credentials as such, so they are renewed
+    by acquiring them again.  For initiator credentials to actually be
+    refreshed, the credential store should name a client keytab (the
+    ``client_keytab`` store key, or the `client_keytab` argument to
+    :meth:`get`), from which the GSSAPI implementation can obtain new
+    initial credentials (:requires-ext:`cred_store`).
+
+    Renewed credentials replace the previous ones atomically: callers
+    holding the previous credentials may continue using them, and later
+    calls to :meth:`get` return the new ones.  If renewal fails, the
+    previous credentials are kept and renewal is retried on the next check,
+    until they actually expire, at which point :meth:`get` acquires them
+    itself (and so raises any errors).
+
+    This class is thread-safe, and may be used as a context manager, in
+    which case it is closed when the block is exited.
+    """
+
+    def __init__(
+        self,
+        renew_fraction: float = 0.5,
+        check_interval: float = 10,
+        background: bool = True,
+    ) -> None:
+        """
+        Args:
+            renew_fraction (float): the fraction of the remaining lifetime
+                of credentials after which they are renewed
+            check_interval (float): how often, in seconds, the background
+                thread checks for credentials which need renewing
+            background (bool): whether to start the background thread
+        """
+
+        if not 0 < renew_fraction <= 1:
+            raise ValueError("renew_fraction must be between 0 and 1")
+
+        self.renew_fraction = renew_fraction
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._entries: t.Dict[_CredKey, _ManagedCredentials] = {}
+
+        self._stop = threading.Event()
+        self._thread: t.Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(target=self._maintain,
+                                            name='gssapi-cred-manager',
+                                            daemon=True)
+            self._thread.start()
+
+    def get(
+        self,
+        name: t.Optional[rnames.Name] = None,
+        usage: str = 'initiate',
+        mechs: t.Optional[t.Iterable[roids.OID]] = None,
+        store: t.Optional[
+            t.Dict[t.Union[bytes, str], t.Union[bytes, str]]
+        ] = None,
+        client_keytab: t.Optional[str] = None,
+        lifetime: t.Optional[int] = None,
+    ) -> Credentials:
+        """Get a set of managed credentials
+
+        The credentials are acquired as per :meth:`Credentials.acquire`
+        the first time they are requested (or if they have expired), and
+        renewed in the background afterwards.
+
+        Args:
+            name (~gssapi.names.Name): the name associated with the
+                credentials, or None for the default name
+            usage (str): the usage for the credentials -- either
+                'both', 'initiate', or 'accept'
+            mechs (list): the desired mechanisms for the credentials, or None
+                for the default mechanisms
+            store (dict): the credential store to acquire the credentials
+                from, as per :meth:`Credentials.acquire`
+            client_keytab (str): the client keytab to acquire initiator
+                credentials from (:requires-ext:`cred_store`), which is
+                added to the credential store
+            lifetime (int): the desired lifetime of the credentials in
+                seconds, or None for indefinite
+
+        Returns:
+            Credentials: the current credentials
+
+        Raises:
+            ~gssapi.exceptions.BadMechanismError
+            ~gssapi.exceptions.BadNameTypeError
+            ~gssapi.exceptions.BadNameError
+            ~gssapi.exceptions.ExpiredCredentialsError
+            ~gssapi.exceptions.MissingCredentialsError
+            ValueError: the manager has been closed
+        """
+
+        if client_keytab is not None:
+            store = dict(store or {})
+            store['client_keytab'] = client_keytab
+
+        mech_list = list(mechs) if mechs is not None else None
+        key = _cred_key(name, None, mech_list, usage, store)
+
+        with self._lock:
+            if self._stop.is_set():
+                raise ValueError("The credential manager has been closed")
+
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _ManagedCredentials(name, lifetime, mech_list, usage,
+                                            store)
+                self._entries[key] = entry
+
+            creds = entry.creds
+            if creds is not None and not creds.is_expiring():
+                return creds
+
+        # the first request (or renewal has been failing) -- acquire outside
+        # the lock, so that other credentials aren't held up
+        return self._renew(entry)
+
+    def forget(
+        self,
+        name: t.Optional[rnames.Name] = None,
+        usage: str = 'initiate',
+        mechs: t.Optional[t.Iterable[roids.OID]] = None,
+        store: t.Optional[
+            t.Dict[t.Union[bytes, str], t.Union[bytes, str]]
+        ] = None,
+        client_keytab: t.Optional[str] = None,
+    ) -> None:
+        """Stop managing a set of credentials
+
+        The arguments are the same as those passed to :meth:`get`.
+        """
+
+        if client_keytab is not None:
+            store = dict(store or {})
+            store['client_keytab'] = client_keytab
+
+        mech_list = list(mechs) if mechs is not None else None
+        with self._lock:
+            key = _cred_key(name, None, mech_list, usage, store)
+            self._entries.pop(key, None)
+
+    def renew(self) -> None:
+        """Renew any managed credentials which are due for renewal
+
+        This is called periodically by the background thread.  Errors are
+        ignored, leaving the previous credentials in place.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            due = [entry for entry in self._entries.values()
+                   if entry.renew_at is not None and entry.renew_at <= now]
+
+        for entry in due:
+            if self._stop.is_set():
+                return
+
+            try:
+                self._renew(entry)
+            except Exception:
+                # retry on the next check -- get() acquires the credentials
+                # itself (and so raises the error) once they've expired
+                pass
+
+    def close(self) -> None:
+        """Stop the background thread and forget all credentials"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        with self._lock:
+            self._entries.clear()
+
+    def __enter__(self) -> "CredentialManager":
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        self.close()
+
+    def _renew(
+        self,
+        entry: _ManagedCredentials,
+    ) -> Credentials:
+        # make sure the credentials are actually acquired again
+        invalidate_acquire_cache(entry.name, entry.usage)
+        creds = Credentials(name=entry.name, lifetime=entry.lifetime,
+                            mechs=entry.mechs, usage=entry.usage,
+                            store=entry.store)
+
+        expires_at = creds.expires_at
+        with self._lock:
+            entry.creds = creds
+            if expires_at is None:
+                entry.renew_at = None
+            else:
+                remaining = max(expires_at - time.monotonic(), 0)
+                entry.renew_at = (time.monotonic() +
+                                  remaining * self.renew_fraction)
+
+        return creds
+
+    def _maintain(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            self.renew()
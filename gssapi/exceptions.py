@@ -45,3 +45,8 @@ class EncryptionNotUsed(GeneralError):
         super(EncryptionNotUsed, self).__init__(minor_message, **kwargs)
 
         self.unwrapped_message = unwrapped_message
+
+
+class MutualAuthenticationError(GeneralError):
+    """An Error indicating that the other party could not be authenticated"""
+    MAJOR_MESSAGE = "Unable to authenticate the {party}"
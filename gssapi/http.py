@@ -0,0 +1,632 @@
+"""HTTP Negotiate Authentication
+
+This module implements HTTP Negotiate (SPNEGO) authentication, as described
+in :rfc:`4559`.
+
+On the server side, it provides WSGI and ASGI middleware.  Once a client has
+authenticated, the name of the initiator is stored in a signed session
+cookie, so that subsequent requests from the same client do not need to go
+through GSSAPI again until the cookie expires.  The cookie never outlives
+the security context it was created from.
+
+On the client side, it provides :class:`NegotiateAuth`, which can be used
+with `requests` and `httpx`.  Since Negotiate authenticates connections
+rather than individual requests, it only performs a handshake when the
+server asks for one, which is only needed once per connection by servers
+which keep connections authenticated.
+"""
+
+import base64
+import binascii
+import functools
+import hashlib
+import hmac
+import http.cookies
+import os
+import re
+import threading
+import time
+import typing as t
+import urllib.parse
+
+import gssapi.exceptions as excs
+from gssapi.creds import Credentials
+from gssapi.names import Name
+from gssapi.raw import oids as roids
+from gssapi.raw.misc import GSSError
+from gssapi.raw.types import NameType, RequirementFlag
+from gssapi.sec_contexts import AcceptorPool, SecurityContext
+
+_WSGIApp = t.Callable[[t.Dict[str, t.Any], t.Callable], t.Iterable[bytes]]
+_ASGIApp = t.Callable[[t.Dict[str, t.Any], t.Callable, t.Callable],
+                      t.Awaitable[None]]
+
+_UNAUTHORIZED_BODY = b'Unauthorized'
+
+# the SPNEGO mechanism, as used by HTTP Negotiate
+_SPNEGO = roids.OID.from_int_seq('1.3.6.1.5.5.2')
+
+_NEGOTIATE_CHALLENGE = re.compile(
+    r'(?:^|,)\s*Negotiate(?:\s+([A-Za-z0-9+/=]+))?\s*(?:,|$)', re.I)
+
+
+def _negotiate_token(
+    header: t.Optional[str],
+) -> t.Optional[bytes]:
+    # returns None if there's no Negotiate challenge, and an empty token if
+    # there's a challenge without a token
+    if not header:
+        return None
+
+    match = _NEGOTIATE_CHALLENGE.search(header)
+    if match is None:
+        return None
+
+    try:
+        return base64.b64decode(match.group(1) or b'')
+    except binascii.Error:
+        return None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+class _NegotiateAcceptor:
+    """The parts of the Negotiate middleware common to WSGI and ASGI"""
+
+    def __init__(
+        self,
+        acceptor_pool: t.Optional[AcceptorPool] = None,
+        secret: t.Optional[bytes] = None,
+        max_age: int = 3600,
+        cookie_name: str = 'gssapi_session',
+        secure_cookie: bool = True,
+    ) -> None:
+        self.acceptor_pool = acceptor_pool or AcceptorPool()
+        self.max_age = max_age
+        self.cookie_name = cookie_name
+        self.secure_cookie = secure_cookie
+
+        self._secret = secret if secret is not None else os.urandom(32)
+
+    def _sign(
+        self,
+        payload: bytes,
+    ) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    def _make_cookie(
+        self,
+        user: str,
+        lifetime: t.Optional[int],
+    ) -> t.Optional[str]:
+        max_age = self.max_age
+        if lifetime is not None:
+            max_age = min(max_age, lifetime)
+        if max_age <= 0:
+            return None
+
+        expires = int(time.time()) + max_age
+        payload = f'{expires}:{user}'.encode('utf-8')
+        value = f'{_b64encode(payload)}.{_b64encode(self._sign(payload))}'
+
+        cookie = (f'{self.cookie_name}={value}; Max-Age={max_age}; Path=/; '
+                  'HttpOnly; SameSite=Lax')
+        if self.secure_cookie:
+            cookie += '; Secure'
+
+        return cookie
+
+    def _check_cookie(
+        self,
+        cookie_header: t.Optional[str],
+    ) -> t.Optional[str]:
+        if not cookie_header:
+            return None
+
+        try:
+            morsel = http.cookies.SimpleCookie(cookie_header).get(
+                self.cookie_name)
+        except http.cookies.CookieError:
+            return None
+        if morsel is None:
+            return None
+
+        try:
+            payload_str, _, signature_str = morsel.value.partition('.')
+            payload = _b64decode(payload_str)
+            signature = _b64decode(signature_str)
+        except (binascii.Error, ValueError):
+            return None
+
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+
+        expires, _, user = payload.decode('utf-8').partition(':')
+        if int(expires) <= time.time():
+            return None
+
+        return user
+
+    def _parse_token(
+        self,
+        auth_header: t.Optional[str],
+    ) -> t.Optional[bytes]:
+        if not auth_header:
+            return None
+
+        scheme, _, token = auth_header.strip().partition(' ')
+        if scheme.lower() != 'negotiate':
+            return None
+
+        try:
+            return base64.b64decode(token.strip(), validate=True)
+        except (binascii.Error, ValueError):
+            return None
+
+    def _finish(
+        self,
+        context: SecurityContext,
+        out_token: t.Optional[bytes],
+    ) -> t.Tuple[t.Optional[str], t.List[t.Tuple[str, str]]]:
+        # returns the authenticated user (if any) and the extra response
+        # headers
+        headers = []
+        if out_token:
+            # the final token lets the client authenticate us in turn
+            headers.append(('WWW-Authenticate',
+                            'Negotiate ' +
+                            base64.b64encode(out_token).decode('ascii')))
+
+        if not context.complete:
+            # we keep no state between requests, so only single round-trip
+            # mechanisms (such as Kerberos) can complete
+            return None, headers
+
+        user = str(context.initiator_name)
+        cookie = self._make_cookie(user, context.lifetime)
+        if cookie is not None:
+            headers.append(('Set-Cookie', cookie))
+
+        return user, headers
+
+    def _challenge_headers(
+        self,
+        headers: t.List[t.Tuple[str, str]],
+    ) -> t.List[t.Tuple[str, str]]:
+        if not any(name == 'WWW-Authenticate' for name, _ in headers):
+            headers = headers + [('WWW-Authenticate', 'Negotiate')]
+
+        return headers + [
+            ('Content-Type', 'text/plain'),
+            ('Content-Length', str(len(_UNAUTHORIZED_BODY))),
+        ]
+
+
+class WSGINegotiateMiddleware(_NegotiateAcceptor):
+    """WSGI middleware requiring HTTP Negotiate authentication
+
+    Requests which carry a valid session cookie or a valid Negotiate token
+    are passed on to the wrapped application with ``REMOTE_USER`` set to the
+    name of the authenticated initiator and ``AUTH_TYPE`` set to
+    ``'Negotiate'``.  All other requests are answered with a
+    ``401 Unauthorized`` challenge.
+
+    Each request carrying a Negotiate token is accepted with a new security
+    context from the acceptor pool.  No state is kept between requests, so
+    only mechanisms which complete in a single round trip are supported.
+    """
+
+    def __init__(
+        self,
+        app: _WSGIApp,
+        acceptor_pool: t.Optional[AcceptorPool] = None,
+        secret: t.Optional[bytes] = None,
+        max_age: int = 3600,
+        cookie_name: str = 'gssapi_session',
+        secure_cookie: bool = True,
+    ) -> None:
+        """
+        Args:
+            app (callable): the WSGI application to wrap
+            acceptor_pool (AcceptorPool): the pool to create accepting
+                security contexts from, or None to use the default acceptor
+                credentials
+            secret (bytes): the key to sign session cookies with, or None to
+                use a random key, in which case sessions are only valid for
+                this process
+            max_age (int): the maximum lifetime of a session, in seconds.
+                Sessions never outlive the security context they came from.
+            cookie_name (str): the name of the session cookie
+            secure_cookie (bool): whether the session cookie should only be
+                sent over HTTPS
+        """
+
+        super(WSGINegotiateMiddleware, self).__init__(
+            acceptor_pool, secret, max_age, cookie_name, secure_cookie)
+        self.app = app
+
+    def __call__(
+        self,
+        environ: t.Dict[str, t.Any],
+        start_response: t.Callable,
+    ) -> t.Iterable[bytes]:
+        user = self._check_cookie(environ.get('HTTP_COOKIE'))
+        if user is not None:
+            return self._call_app(user, [], environ, start_response)
+
+        headers: t.List[t.Tuple[str, str]] = []
+        token = self._parse_token(environ.get('HTTP_AUTHORIZATION'))
+        if token is not None:
+            context = self.acceptor_pool.new_context()
+            try:
+                user, headers = self._finish(context, context.step(token))
+            except GSSError:
+                user, headers = None, []
+
+        if user is not None:
+            return self._call_app(user, headers, environ, start_response)
+
+        start_response('401 Unauthorized', self._challenge_headers(headers))
+        return [_UNAUTHORIZED_BODY]
+
+    def _call_app(
+        self,
+        user: str,
+        extra_headers: t.List[t.Tuple[str, str]],
+        environ: t.Dict[str, t.Any],
+        start_response: t.Callable,
+    ) -> t.Iterable[bytes]:
+        environ['REMOTE_USER'] = user
+        environ['AUTH_TYPE'] = 'Negotiate'
+
+        if not extra_headers:
+            return self.app(environ, start_response)
+
+        def add_headers(
+            status: str,
+            headers: t.List[t.Tuple[str, str]],
+            exc_info: t.Any = None,
+        ) -> t.Callable:
+            return start_response(status, headers + extra_headers, exc_info)
+
+        return self.app(environ, add_headers)
+
+
+class ASGINegotiateMiddleware(_NegotiateAcceptor):
+    """ASGI middleware requiring HTTP Negotiate authentication
+
+    This works like :class:`WSGINegotiateMiddleware`, except that the name
+    of the authenticated initiator is passed on in the ``'remote_user'``
+    key of the connection scope.  Only HTTP connections are authenticated;
+    other connection types are passed through as-is.
+    """
+
+    def __init__(
+        self,
+        app: _ASGIApp,
+        acceptor_pool: t.Optional[AcceptorPool] = None,
+        secret: t.Optional[bytes] = None,
+        max_age: int = 3600,
+        cookie_name: str = 'gssapi_session',
+        secure_cookie: bool = True,
+    ) -> None:
+        """
+        Args:
+            app (callable): the ASGI application to wrap
+            acceptor_pool (AcceptorPool): the pool to create accepting
+                security contexts from, or None to use the default acceptor
+                credentials
+            secret (bytes): the key to sign session cookies with, or None to
+                use a random key, in which case sessions are only valid for
+                this process
+            max_age (int): the maximum lifetime of a session, in seconds.
+                Sessions never outlive the security context they came from.
+            cookie_name (str): the name of the session cookie
+            secure_cookie (bool): whether the session cookie should only be
+                sent over HTTPS
+        """
+
+        super(ASGINegotiateMiddleware, self).__init__(
+            acceptor_pool, secret, max_age, cookie_name, secure_cookie)
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: t.Dict[str, t.Any],
+        receive: t.Callable,
+        send: t.Callable,
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {}
+        for name, value in scope['headers']:
+            if name in (b'cookie', b'authorization'):
+                request_headers[name] = value.decode('latin-1')
+
+        user = self._check_cookie(request_headers.get(b'cookie'))
+        if user is not None:
+            await self._call_app(user, [], scope, receive, send)
+            return
+
+        headers: t.List[t.Tuple[str, str]] = []
+        token = self._parse_token(request_headers.get(b'authorization'))
+        if token is not None:
+            context = self.acceptor_pool.new_context()
+            try:
+                user, headers = self._finish(context,
+                                             await context.astep(token))
+            except GSSError:
+                user, headers = None, []
+
+        if user is not None:
+            await self._call_app(user, headers, scope, receive, send)
+            return
+
+        await send({
+            'type': 'http.response.start',
+            'status': 401,
+            'headers': [(name.lower().encode('latin-1'),
+                         value.encode('latin-1'))
+                        for name, value in self._challenge_headers(headers)],
+        })
+        await send({'type': 'http.response.body',
+                    'body': _UNAUTHORIZED_BODY})
+
+    async def _call_app(
+        self,
+        user: str,
+        extra_headers: t.List[t.Tuple[str, str]],
+        scope: t.Dict[str, t.Any],
+        receive: t.Callable,
+        send: t.Callable,
+    ) -> None:
+        scope = dict(scope, remote_user=user)
+
+        if not extra_headers:
+            await self.app(scope, receive, send)
+            return
+
+        encoded_headers = [(name.lower().encode('latin-1'),
+                            value.encode('latin-1'))
+                           for name, value in extra_headers]
+
+        async def add_headers(message: t.Dict[str, t.Any]) -> None:
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', [])) + encoded_headers
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, add_headers)
+
+
+class NegotiateAuth:
+    """Client side HTTP Negotiate authentication
+
+    This class performs Negotiate authentication for HTTP clients.
+    Since Negotiate authenticates connections rather than requests, no
+    token is sent until the server asks for one with a ``401`` response,
+    so that servers which keep connections authenticated are only asked
+    for a handshake once per connection.  The target
+    :class:`~gssapi.names.Name` for each host is created once and reused.
+
+    An instance of this class may be passed directly as the `auth`
+    argument in `requests`.  For `httpx`, use :meth:`httpx_auth`.  Other
+    HTTP clients can use :meth:`start` and :meth:`finish` directly.
+
+    This class is thread-safe.
+    """
+
+    def __init__(
+        self,
+        service: str = 'HTTP',
+        creds: t.Optional[Credentials] = None,
+        mech: t.Optional[roids.OID] = _SPNEGO,
+        mutual_authentication: bool = True,
+        delegate: bool = False,
+    ) -> None:
+        """
+        Args:
+            service (str): the service part of the target service name
+            creds (Credentials): the credentials to authenticate with, or
+                None to use the default credentials
+            mech (OID): the mechanism to use, SPNEGO by default
+            mutual_authentication (bool): whether the server must
+                authenticate itself in turn
+            delegate (bool): whether to delegate our credentials to
+                the server
+        """
+
+        self.service = service
+        self.creds = creds
+        self.mech = mech
+        self.mutual_authentication = mutual_authentication
+
+        flags = int(RequirementFlag.out_of_sequence_detection)
+        if mutual_authentication:
+            flags |= RequirementFlag.mutual_authentication
+        if delegate:
+            flags |= RequirementFlag.delegate_to_peer
+        self.flags = flags
+
+        self._lock = threading.Lock()
+        self._names: t.Dict[str, Name] = {}
+
+    def target_name(
+        self,
+        host: str,
+    ) -> Name:
+        """Get the target name for a host
+
+        Args:
+            host (str): the host name
+
+        Returns:
+            Name: the (shared) name of the service on the given host
+        """
+
+        name = self._names.get(host)
+        if name is None:
+            name = Name(f'{self.service}@{host}',
+                        name_type=NameType.hostbased_service)
+            with self._lock:
+                name = self._names.setdefault(host, name)
+
+        return name
+
+    def start(
+        self,
+        host: str,
+    ) -> t.Tuple[SecurityContext, str]:
+        """Start authenticating to a host
+
+        Args:
+            host (str): the host name
+
+        Returns:
+            tuple: the new security context, and the value of the
+            ``Authorization`` header to send
+
+        Raises:
+            ~gssapi.exceptions.GSSError
+        """
+
+        context = SecurityContext(name=self.target_name(host),
+                                  creds=self.creds, mech=self.mech,
+                                  flags=self.flags, usage='initiate')
+        token = context.step()
+        return context, 'Negotiate ' + base64.b64encode(
+            token or b'').decode('ascii')
+
+    def finish(
+        self,
+        context: SecurityContext,
+        host: str,
+        challenge: t.Optional[str],
+    ) -> None:
+        """Finish authenticating to a host
+
+        This processes the server's final token, if any.  It should be
+        called for the successful (``2xx``) response to the request
+        carrying the token from :meth:`start`.
+
+        Args:
+            context (SecurityContext): the context returned by :meth:`start`
+            host (str): the host name
+            challenge (str): the value of the ``WWW-Authenticate`` header
+                of the successful response, if any
+
+        Raises:
+            ~gssapi.exceptions.MutualAuthenticationError: the server could
+                not be authenticated
+            ~gssapi.exceptions.GSSError
+        """
+
+        token = _negotiate_token(challenge)
+        if token:
+            context.step(token)
+
+        if self.mutual_authentication and not context.complete:
+            raise excs.MutualAuthenticationError(
+                "The server did not send a valid final token",
+                party=f"server {host}")
+
+    # requests support
+    def __call__(
+        self,
+        request: t.Any,
+    ) -> t.Any:
+        request.register_hook('response', self.handle_response)
+        return request
+
+    def handle_response(
+        self,
+        response: t.Any,
+        **kwargs: t.Any,
+    ) -> t.Any:
+        """Authenticate a request if the response asks for it
+
+        This is a `requests` response hook, and is registered automatically
+        when this object is used as the `auth` argument.
+        """
+
+        if (response.status_code != 401 or
+                _negotiate_token(response.headers.get('WWW-Authenticate'))
+                is None):
+            return response
+
+        request = response.request
+        host = urllib.parse.urlsplit(response.url).hostname or ''
+
+        if _negotiate_token(request.headers.get('Authorization')) is not None:
+            # we already tried and failed
+            return response
+
+        context, header = self.start(host)
+
+        # consume the body so the connection can be reused
+        response.content
+        response.raw.release_conn()
+
+        request = request.copy()
+        request.headers['Authorization'] = header
+        new_response = response.connection.send(request, **kwargs)
+        new_response.history.append(response)
+        new_response.request = request
+
+        # only a successful response carries the final token -- others
+        # are returned as they are
+        if 200 <= new_response.status_code < 300:
+            self.finish(context, host,
+                        new_response.headers.get('WWW-Authenticate'))
+
+        return new_response
+
+    def httpx_auth(self) -> t.Any:
+        """Get an `httpx` authentication object using this object
+
+        Returns:
+            httpx.Auth: the authentication object
+        """
+
+        return _httpx_auth_class()(self)
+
+
+@functools.lru_cache(maxsize=None)
+def _httpx_auth_class() -> t.Type:
+    import httpx
+
+    class HTTPXNegotiateAuth(httpx.Auth):
+        def __init__(
+            self,
+            negotiate: NegotiateAuth,
+        ) -> None:
+            self.negotiate = negotiate
+
+        def auth_flow(
+            self,
+            request: httpx.Request,
+        ) -> t.Generator[httpx.Request, httpx.Response, None]:
+            response = yield request
+            if (response.status_code != 401 or
+                    _negotiate_token(response.headers.get('WWW-Authenticate'))
+                    is None):
+                return
+
+            host = request.url.host
+            context, header = self.negotiate.start(host)
+            request.headers['Authorization'] = header
+            response = yield request
+
+            if 200 <= response.status_code < 300:
+                self.negotiate.finish(
+                    context, host, response.headers.get('WWW-Authenticate'))
+
+    return HTTPXNegotiateAuth
@@ -1,13 +1,21 @@
 
+import collections
+import concurrent.futures
+import math
+import os
+import threading
+import types
 import typing as t
 
 from gssapi.raw import names as rname
 from gssapi.raw import NameType
 from gssapi.raw import named_tuples as tuples
 from gssapi.raw import oids as roids
+from gssapi.raw.misc import GSSError
+from gssapi.raw.types import MechType
 from gssapi import _utils
 
-from collections.abc import MutableMapping, Iterable
+from collections.abc import MutableMapping, MutableSet, Iterable
 
 rname_rfc6680 = _utils.import_gssapi_extension('rfc6680')
 rname_rfc6680_comp_oid = _utils.import_gssapi_extension('rfc6680_comp_oid')
@@ -36,7 +44,20 @@ class Name(rname.Name):
         defaults to UTF-8.
     """
 
-    __slots__ = ('_attr_obj')
+    # the attribute mapping (created on first use), whether this name is
+    # shared through the interning cache (see `enable_name_interning`), the
+    # memoized results of display_name (and its decoded form, along with
+    # the encoding used) and inquire_name, and the key used for hashing
+    # (see `_key`)
+    __slots__ = ('_attr_obj', '_interned', '_display', '_display_str',
+                 '_inquire_res', '_hash_key')
+
+    _attr_obj: t.Optional["_NameAttributeMapping"]
+    _interned: bool
+    _display: t.Optional[tuples.DisplayNameResult]
+    _display_str: t.Optional[t.Tuple[str, str]]
+    _inquire_res: t.Optional[tuples.InquireNameResult]
+    _hash_key: t.Optional[t.Tuple[t.Any, ...]]
 
     def __new__(
         cls,
@@ -75,11 +96,29 @@ class Name(rname.Name):
             if isinstance(base, str):
                 base = base.encode(_utils._get_encoding())
 
+            cache = _intern_cache
+            if cache is not None and base is not None:
+                return cache.get(cls, base, name_type)
+
             base_name = rname.import_name(
                 base,  # type: ignore[arg-type]
                 name_type)
 
-        return t.cast("Name", super(Name, cls).__new__(cls, base_name))
+        return cls._wrap(base_name)
+
+    @classmethod
+    def _wrap(
+        cls,
+        base_name: rname.Name,
+    ) -> "Name":
+        name = t.cast("Name", super(Name, cls).__new__(cls, base_name))
+        name._attr_obj = None
+        name._interned = False
+        name._display = None
+        name._display_str = None
+        name._inquire_res = None
+        name._hash_key = None
+        return name
 
     def __init__(
         self,
@@ -106,21 +145,27 @@ class Name(rname.Name):
         the human-readable string and the `name_type` argument to denote the
         name type.
 
+        If name interning is enabled (see :func:`enable_name_interning`),
+        names created from a human-readable string are shared, and so are
+        read-only.
+
         Raises:
             ~gssapi.exceptions.BadNameTypeError
             ~gssapi.exceptions.BadNameError
             ~gssapi.exceptions.BadMechanismError
         """
 
-        self._attr_obj: t.Optional[_NameAttributeMapping]
-
-        if rname_rfc6680 is not None:
-            self._attr_obj = _NameAttributeMapping(self)
-        else:
-            self._attr_obj = None
+        # everything is set up in __new__, so that interned names (which
+        # __new__ returns again) aren't set up again here
 
     def __str__(self) -> str:
-        return bytes(self).decode(_utils._get_encoding())
+        encoding = _utils._get_encoding()
+        display_str = self._display_str
+        if display_str is None or display_str[0] != encoding:
+            display_str = (encoding, bytes(self).decode(encoding))
+            self._display_str = display_str
+
+        return display_str[1]
 
     def __unicode__(self) -> str:
         # Python 2 -- someone asked for unicode
@@ -128,7 +173,24 @@ class Name(rname.Name):
 
     def __bytes__(self) -> bytes:
         # Python 3 -- someone asked for bytes
-        return rname.display_name(self, name_type=False).name
+        return self._display_name().name
+
+    def _display_name(self) -> tuples.DisplayNameResult:
+        # names only change when their attributes are modified (see
+        # `_clear_caches`), so the displayed form can be reused
+        display = self._display
+        if display is None:
+            display = rname.display_name(self, name_type=True)
+            self._display = display
+
+        return display
+
+    def _clear_caches(self) -> None:
+        self._display = None
+        self._display_str = None
+        self._inquire_res = None
+        if self._attr_obj is not None:
+            self._attr_obj._snapshot = None
 
     def display_as(
         self,
@@ -179,7 +241,7 @@ class Name(rname.Name):
     @property
     def name_type(self) -> t.Optional[roids.OID]:
         """The :class:`~gssapi.raw.types.NameType` of this name"""
-        return rname.display_name(self, name_type=True).name_type
+        return self._display_name().name_type
 
     def __eq__(
         self,
@@ -198,8 +260,22 @@ class Name(rname.Name):
     ) -> bool:
         return not self.__eq__(other)
 
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def _key(self) -> t.Tuple[t.Any, ...]:
+        # the exported form of a mechanism name identifies it, and names
+        # which aren't mechanism names are exported as kerberos names, so
+        # that equal names (as per compare_name) hash the same
+        key = self._hash_key
+        if key is None:
+            key = _name_key(self)
+            self._hash_key = key
+
+        return key
+
     def __repr__(self) -> str:
-        disp_res = rname.display_name(self, name_type=True)
+        disp_res = self._display_name()
         return "Name({name!r}, {name_type})".format(
             name=disp_res.name, name_type=disp_res.name_type)
 
@@ -305,8 +381,17 @@ class Name(rname.Name):
         attrs = kwargs.get('attrs', default_val)
         mech_name = kwargs.get('mech_name', default_val)
 
-        return rname_rfc6680.inquire_name(self, mech_name=mech_name,
-                                          attrs=attrs)
+        # the result is reused until the attributes are modified (see
+        # `_clear_caches`)
+        res = self._inquire_res
+        if res is None:
+            res = rname_rfc6680.inquire_name(self, mech_name=True, attrs=True)
+            self._inquire_res = res
+
+        return tuples.InquireNameResult(
+            list(res.attrs) if attrs else [],
+            res.is_mech_name if mech_name else False,
+            res.mech if mech_name else t.cast(roids.OID, None))
 
     @property
     def is_mech_name(self) -> bool:
@@ -338,12 +423,18 @@ class Name(rname.Name):
         Note:
             String types (includes :class:`bytes`) are not considered to
             be iterables in this case.
+
+        All the attributes may be fetched at once with the mapping's
+        ``snapshot()`` method, which returns a read-only mapping.
         """
-        if self._attr_obj is None:
+        if rname_rfc6680 is None:
             raise NotImplementedError("Your GSSAPI implementation does not "
                                       "support RFC 6680 (the GSSAPI naming "
                                       "extensions)")
 
+        if self._attr_obj is None:
+            self._attr_obj = _NameAttributeMapping(self)
+
         return self._attr_obj
 
 
@@ -355,6 +446,9 @@ class _NameAttributeMapping(MutableMapping):
         name: Name,
     ) -> None:
         self._name = name
+        self._snapshot: t.Optional[
+            t.Mapping[bytes, tuples.GetNameAttributeResult]
+        ] = None
 
     def __getitem__(
         self,
@@ -363,9 +457,13 @@ class _NameAttributeMapping(MutableMapping):
         if isinstance(key, str):
             key = key.encode(_utils._get_encoding())
 
-        res = rname_rfc6680.get_name_attribute(  # type: ignore[union-attr]
-            self._name, key)
-        res = t.cast(tuples.GetNameAttributeResult, res)
+        snapshot = self._snapshot
+        if snapshot is not None and key in snapshot:
+            res = snapshot[key]
+        else:
+            res = rname_rfc6680.get_name_attribute(  # type: ignore[union-attr]
+                self._name, key)
+            res = t.cast(tuples.GetNameAttributeResult, res)
 
         return tuples.GetNameAttributeResult(list(res.values),
                                              list(res.display_values),
@@ -379,6 +477,9 @@ class _NameAttributeMapping(MutableMapping):
             tuples.GetNameAttributeResult, t.Tuple[bytes, bool], bytes
         ],
     ) -> None:
+        self._check_writable()
+        self._name._clear_caches()
+
         if isinstance(key, str):
             key = key.encode(_utils._get_encoding())
 
@@ -408,6 +509,9 @@ class _NameAttributeMapping(MutableMapping):
         self,
         key: t.Union[bytes, str],
     ) -> None:
+        self._check_writable()
+        self._name._clear_caches()
+
         if isinstance(key, str):
             key = key.encode(_utils._get_encoding())
 
@@ -419,3 +523,361 @@ class _NameAttributeMapping(MutableMapping):
 
     def __len__(self) -> int:
         return len(self._name._inquire(attrs=True).attrs)
+
+    def snapshot(self) -> t.Mapping[bytes, tuples.GetNameAttributeResult]:
+        """Get all the attributes of the name at once
+
+        Every value of every attribute is fetched in a single pass, and
+        returned as a read-only mapping from attribute names to
+        :class:`~gssapi.raw.named_tuples.GetNameAttributeResult` objects
+        (whose values are tuples).  The snapshot is reused, and also used by
+        item lookups, until the attributes of the name are modified.
+
+        Returns:
+            Mapping: the attributes of the name
+        """
+
+        if self._snapshot is not None:
+            return self._snapshot
+
+        attrs = self._name._inquire(attrs=True).attrs
+        res = rname_rfc6680.get_name_attributes(  # type: ignore[union-attr]
+            self._name, attrs)
+
+        self._snapshot = types.MappingProxyType({
+            attr: tuples.GetNameAttributeResult(
+                t.cast(t.List[bytes], tuple(attr_res.values)),
+                t.cast(t.List[bytes], tuple(attr_res.display_values)),
+                attr_res.authenticated, attr_res.complete)
+            for attr, attr_res in res.items()})
+
+        return self._snapshot
+
+    def _check_writable(self) -> None:
+        if self._name._interned:
+            raise TypeError("Interned names are read-only -- use "
+                            "copy.copy() to get a name which can be modified")
+
+
+def _name_key(
+    name: rname.Name,
+) -> t.Tuple[t.Any, ...]:
+    try:
+        return ('export', rname.export_name(name))
+    except GSSError:
+        pass
+
+    try:
+        canon_name = rname.canonicalize_name(name, MechType.kerberos)
+        return ('export', rname.export_name(canon_name))
+    except GSSError:
+        # not something kerberos understands -- fall back to the displayed
+        # form, which may consider some equal names to be different
+        displ_name = rname.display_name(name, name_type=True)
+        return ('display', displ_name.name, displ_name.name_type)
+
+
+def canonicalize_names(
+    names: t.Iterable[rname.Name],
+    mech: roids.OID,
+) -> t.List[t.Union[Name, GSSError]]:
+    """Canonicalize many names with respect to a mechanism
+
+    This is equivalent to calling :meth:`Name.canonicalize` on each name,
+    but makes only a single call into the low-level API
+    (see :func:`~gssapi.raw.names.canonicalize_names`).
+
+    Args:
+        names (list): the names to canonicalize
+        mech (~gssapi.OID): the :class:`MechType` to use
+
+    Returns:
+        list: a canonicalized :class:`Name` or
+        :class:`~gssapi.exceptions.GSSError` for each name, in the same order
+    """
+
+    return [Name(res) if isinstance(res, rname.Name) else res
+            for res in rname.canonicalize_names(names, mech)]
+
+
+def export_names(
+    names: t.Iterable[rname.Name],
+) -> t.List[t.Union[bytes, GSSError]]:
+    """Export many mechanism names as tokens
+
+    This is equivalent to calling :meth:`Name.export` on each name, but
+    makes only a single call into the low-level API
+    (see :func:`~gssapi.raw.names.export_names`).
+
+    Args:
+        names (list): the mechanism names to export
+
+    Returns:
+        list: the exported name (:class:`bytes`) or
+        :class:`~gssapi.exceptions.GSSError` for each name, in the same order
+    """
+
+    return rname.export_names(names)
+
+
+def canonicalize_names_parallel(
+    names: t.Iterable[rname.Name],
+    mech: roids.OID,
+    workers: t.Optional[int] = None,
+) -> t.List[t.Union[Name, GSSError]]:
+    """Canonicalize many names on several threads
+
+    The names are split evenly between `workers` threads, each of which
+    processes its share as per :func:`canonicalize_names`.
+
+    Args:
+        names (list): the names to canonicalize
+        mech (~gssapi.OID): the :class:`MechType` to use
+        workers (int): the number of threads to use, or None to use one per
+            CPU
+
+    Returns:
+        list: a canonicalized :class:`Name` or
+        :class:`~gssapi.exceptions.GSSError` for each name, in the same order
+    """
+
+    return _map_parallel(lambda batch: canonicalize_names(batch, mech),
+                         list(names), workers)
+
+
+def export_names_parallel(
+    names: t.Iterable[rname.Name],
+    workers: t.Optional[int] = None,
+) -> t.List[t.Union[bytes, GSSError]]:
+    """Export many mechanism names on several threads
+
+    The names are split evenly between `workers` threads, each of which
+    processes its share as per :func:`export_names`.
+
+    Args:
+        names (list): the mechanism names to export
+        workers (int): the number of threads to use, or None to use one per
+            CPU
+
+    Returns:
+        list: the exported name (:class:`bytes`) or
+        :class:`~gssapi.exceptions.GSSError` for each name, in the same order
+    """
+
+    return _map_parallel(export_names, list(names), workers)
+
+
+_T = t.TypeVar('_T')
+
+
+def _map_parallel(
+    func: t.Callable[[t.List[rname.Name]], t.List[_T]],
+    names: t.List[rname.Name],
+    workers: t.Optional[int],
+) -> t.List[_T]:
+    workers = workers or os.cpu_count() or 1
+    batch_size = max(1, math.ceil(len(names) / workers))
+    batches = [names[i:i + batch_size]
+               for i in range(0, len(names), batch_size)]
+    if len(batches) <= 1:
+        return func(names)
+
+    res: t.List[_T] = []
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(batches),
+            thread_name_prefix='gssapi-names') as executor:
+        for batch_res in executor.map(func, batches):
+            res.extend(batch_res)
+
+    return res
+
+
+class AuthorizationSet(MutableSet):
+    """A set of names, for checking whether names are authorized
+
+    Names are indexed by their exported form (canonicalizing them as
+    Kerberos names first if they aren't already mechanism names), so
+    checking whether a name is in the set takes constant time, rather
+    than comparing it with each name in the set.
+
+    The canonical form of each :class:`Name` is computed once and then
+    remembered by the name, so checking the same name object repeatedly
+    (for example, the initiator name of a security context) only calls into
+    GSSAPI the first time.
+
+    Names which can't be exported or canonicalized as Kerberos names are
+    indexed by their displayed form and name type instead, and so must be
+    given in the same form to be found.
+    """
+
+    def __init__(
+        self,
+        names: t.Iterable[t.Union[rname.Name, bytes, str]] = (),
+        name_type: t.Optional[roids.OID] = None,
+    ) -> None:
+        """
+        Args:
+            names (list): the initial names in the set, as :class:`Name`
+                objects, or strings to import as names
+            name_type (~gssapi.OID): the name type used to import names
+                given as strings
+        """
+
+        self.name_type = name_type
+        self._names: t.Dict[t.Tuple[t.Any, ...], Name] = {}
+        for name in names:
+            self.add(name)
+
+    def _to_name(
+        self,
+        name: t.Union[rname.Name, bytes, str],
+    ) -> Name:
+        if isinstance(name, Name):
+            return name
+        elif isinstance(name, rname.Name):
+            return Name(rname.duplicate_name(name))
+        else:
+            return Name(name, self.name_type)
+
+    def add(
+        self,
+        name: t.Union[rname.Name, bytes, str],
+    ) -> None:
+        high_name = self._to_name(name)
+        self._names[high_name._key()] = high_name
+
+    def discard(
+        self,
+        name: t.Union[rname.Name, bytes, str],
+    ) -> None:
+        self._names.pop(self._to_name(name)._key(), None)
+
+    def __contains__(
+        self,
+        name: object,
+    ) -> bool:
+        if not isinstance(name, (rname.Name, bytes, str)):
+            return False
+
+        return self._to_name(name)._key() in self._names
+
+    def __iter__(self) -> t.Iterator[Name]:
+        return iter(self._names.values())
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return "AuthorizationSet({names!r})".format(
+            names=list(self._names.values()))
+
+
+class NameInterningInfo(t.NamedTuple):
+    """Statistics about the name interning cache"""
+    #: The number of names which were found in the cache
+    hits: int
+    #: The number of names which had to be imported
+    misses: int
+    #: The maximum number of names kept in the cache
+    max_size: int
+    #: The number of names currently in the cache
+    size: int
+
+
+class _InternCache:
+    # an LRU cache of imported names, keyed by the name class, the name
+    # string, and the name type
+    def __init__(
+        self,
+        max_size: int,
+    ) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._names: t.OrderedDict[
+            t.Tuple[type, bytes, t.Optional[roids.OID]], Name
+        ] = collections.OrderedDict()
+
+    def get(
+        self,
+        cls: t.Type[Name],
+        base: bytes,
+        name_type: t.Optional[roids.OID],
+    ) -> Name:
+        key = (cls, base, name_type)
+        with self._lock:
+            name = self._names.get(key)
+            if name is not None:
+                self._names.move_to_end(key)
+                self.hits += 1
+                return name
+
+            self.misses += 1
+
+        # import outside the lock, so that other lookups aren't held up
+        new_name = cls._wrap(rname.import_name(base, name_type))
+        new_name._interned = True
+
+        with self._lock:
+            # another thread may have got there first
+            name = self._names.setdefault(key, new_name)
+            self._names.move_to_end(key)
+            while len(self._names) > self.max_size:
+                self._names.popitem(last=False)
+
+        return name
+
+    def info(self) -> NameInterningInfo:
+        with self._lock:
+            return NameInterningInfo(self.hits, self.misses, self.max_size,
+                                     len(self._names))
+
+
+_intern_cache: t.Optional[_InternCache] = None
+
+
+def enable_name_interning(
+    max_size: int = 1024,
+) -> None:
+    """Share names created from the same string and name type
+
+    Once enabled, constructing a :class:`Name` from a human-readable string
+    returns the same object for the same string and name type, rather than
+    importing the name again.  At most `max_size` names are kept, with the
+    least recently used ones being evicted first.
+
+    Since interned names are shared, they are read-only: modifying their
+    attributes raises a :class:`TypeError`.  A modifiable copy may be made
+    with :func:`copy.copy`.  Names which are modified through the low-level
+    API are not protected, so interned names must not be passed to the
+    low-level functions which modify names.
+
+    Calling this again replaces the cache with an empty one.
+
+    Args:
+        max_size (int): the maximum number of names to keep
+    """
+
+    global _intern_cache
+    _intern_cache = _InternCache(max_size)
+
+
+def disable_name_interning() -> None:
+    """Stop sharing names, and drop any interned names"""
+
+    global _intern_cache
+    _intern_cache = None
+
+
+def name_interning_info() -> t.Optional[NameInterningInfo]:
+    """Get statistics about the name interning cache
+
+    Returns:
+        NameInterningInfo: the hit and miss counts and size of the cache, or
+        None if name interning is not enabled
+    """
+
+    cache = _intern_cache
+    return cache.info() if cache is not None else None
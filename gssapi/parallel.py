@@ -0,0 +1,269 @@
+"""Parallel Message Protection
+
+This module provides helpers for wrapping and unwrapping many independent
+messages in batches on worker threads.
+
+The underlying GSSAPI calls release the GIL for a whole batch at a time, so
+the calling thread can keep producing or consuming messages in the
+meantime.  By default only one batch at a time is processed on a given
+security context, since GSSAPI implementations (such as MIT krb5) generally
+don't allow a security context to be used by several threads at once.
+Implementations which do allow it can opt in to processing several batches
+concurrently, spreading the work over multiple cores.
+"""
+
+import collections
+import concurrent.futures
+import functools
+import math
+import os
+import threading
+import typing as t
+import weakref
+
+from gssapi import _utils
+from gssapi.raw import message as rmessage
+from gssapi.raw import named_tuples as tuples
+from gssapi.raw.misc import GSSError
+from gssapi.raw.types import RequirementFlag
+from gssapi.sec_contexts import SecurityContext
+
+# flags which make the peer reject messages received out of order
+_SEQUENCING_FLAGS = (RequirementFlag.replay_detection,
+                     RequirementFlag.out_of_sequence_detection)
+
+_T = t.TypeVar('_T')
+
+# serializes the batches processed on each security context, across all
+# wrappers which use it
+_context_locks: t.MutableMapping[
+    SecurityContext, threading.Lock
+] = weakref.WeakKeyDictionary()
+_context_locks_lock = threading.Lock()
+
+
+def _context_lock(
+    context: SecurityContext,
+) -> threading.Lock:
+    with _context_locks_lock:
+        lock = _context_locks.get(context)
+        if lock is None:
+            lock = _context_locks[context] = threading.Lock()
+
+        return lock
+
+
+class ParallelWrapper:
+    """Wraps and unwraps messages on a pool of worker threads
+
+    Messages are split into batches, and each batch is processed by
+    :func:`~gssapi.raw.message.wrap_many` or
+    :func:`~gssapi.raw.message.unwrap_many` on one of the worker threads.
+    Results are always returned in the same order as the input messages.
+
+    Unless `concurrent_calls` is True, only one batch at a time is
+    processed on the security context (by any wrapper), so that it is
+    never used by several threads at once.  Other code using the same
+    security context at the same time is not affected by this, however.
+
+    Since batches are not guaranteed to be processed in order, this may
+    only be used with contexts which were established without replay
+    detection and without out-of-sequence detection.
+
+    This class may be used as a context manager, in which case the worker
+    threads are shut down when the block is exited.
+    """
+
+    def __init__(
+        self,
+        context: SecurityContext,
+        workers: t.Optional[int] = None,
+        batch_size: int = 64,
+        concurrent_calls: bool = False,
+    ) -> None:
+        """
+        Args:
+            context (SecurityContext): the established security context
+                to use
+            workers (int): the number of worker threads to use, or None to
+                use one per CPU when `concurrent_calls` is True, and a single
+                one otherwise
+            batch_size (int): the maximum number of messages handed to a
+                worker thread at a time when processing a stream of messages
+            concurrent_calls (bool): whether to process several batches on
+                the security context at once.  Only enable this if your GSSAPI
+                implementation and mechanism are known to allow concurrent
+                message protection calls on the same security context.
+
+        Raises:
+            ValueError: the context requires messages to be processed in
+                sequence
+        """
+
+        if not context.complete:
+            raise ValueError("The security context has not been established")
+
+        flags = context.actual_flags
+        sequencing = [flag.name for flag in _SEQUENCING_FLAGS if flag in flags]
+        if sequencing:
+            raise ValueError("Messages cannot be processed in parallel on "
+                             "a context established with "
+                             f"{' and '.join(sequencing)}")
+
+        self.context = context
+        self.concurrent_calls = concurrent_calls
+        if workers is None:
+            workers = (os.cpu_count() or 1) if concurrent_calls else 1
+        self.workers = workers
+        self.batch_size = batch_size
+        self._lock = _context_lock(context)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='gssapi-parallel')
+
+    def wrap(
+        self,
+        messages: t.Iterable[_utils._BytesLike],
+        encrypt: bool = True,
+    ) -> t.List[t.Union[tuples.WrapResult, GSSError]]:
+        """Wrap a list of messages, optionally with encryption
+
+        The messages are split evenly between the worker threads.
+
+        Args:
+            messages (list): the messages to wrap
+            encrypt (bool): whether or not to encrypt the messages
+
+        Returns:
+            list: a :class:`~gssapi.raw.named_tuples.WrapResult` or
+            :class:`~gssapi.exceptions.GSSError` for each message,
+            in the same order
+        """
+
+        messages = list(messages)
+        func = functools.partial(rmessage.wrap_many, confidential=encrypt)
+        return list(self._map(func, messages, self._even_batch(messages)))
+
+    def unwrap(
+        self,
+        messages: t.Iterable[_utils._BytesLike],
+    ) -> t.List[t.Union[tuples.UnwrapResult, GSSError]]:
+        """Unwrap a list of wrapped messages
+
+        The messages are split evenly between the worker threads.
+
+        Args:
+            messages (list): the messages to unwrap/decrypt
+
+        Returns:
+            list: an :class:`~gssapi.raw.named_tuples.UnwrapResult` or
+            :class:`~gssapi.exceptions.GSSError` for each message,
+            in the same order
+        """
+
+        messages = list(messages)
+        return list(self._map(rmessage.unwrap_many, messages,
+                              self._even_batch(messages)))
+
+    def wrap_stream(
+        self,
+        messages: t.Iterable[_utils._BytesLike],
+        encrypt: bool = True,
+    ) -> t.Iterator[t.Union[tuples.WrapResult, GSSError]]:
+        """Wrap a stream of messages, optionally with encryption
+
+        Messages are read from the input lazily, and only a bounded number
+        of batches are in flight at any time.
+
+        Args:
+            messages (iterable): the messages to wrap
+            encrypt (bool): whether or not to encrypt the messages
+
+        Yields:
+            a :class:`~gssapi.raw.named_tuples.WrapResult` or
+            :class:`~gssapi.exceptions.GSSError` for each message,
+            in the same order
+        """
+
+        func = functools.partial(rmessage.wrap_many, confidential=encrypt)
+        return self._map(func, messages, self.batch_size)
+
+    def unwrap_stream(
+        self,
+        messages: t.Iterable[_utils._BytesLike],
+    ) -> t.Iterator[t.Union[tuples.UnwrapResult, GSSError]]:
+        """Unwrap a stream of wrapped messages
+
+        Messages are read from the input lazily, and only a bounded number
+        of batches are in flight at any time.
+
+        Args:
+            messages (iterable): the messages to unwrap/decrypt
+
+        Yields:
+            an :class:`~gssapi.raw.named_tuples.UnwrapResult` or
+            :class:`~gssapi.exceptions.GSSError` for each message,
+            in the same order
+        """
+
+        return self._map(rmessage.unwrap_many, messages, self.batch_size)
+
+    def close(self) -> None:
+        """Shut down the worker threads, waiting for pending work"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ParallelWrapper":
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        self.close()
+
+    def _locked(
+        self,
+        func: t.Callable[
+            [SecurityContext, t.List[_utils._BytesLike]], t.List[_T]
+        ],
+        context: SecurityContext,
+        batch: t.List[_utils._BytesLike],
+    ) -> t.List[_T]:
+        with self._lock:
+            return func(context, batch)
+
+    def _even_batch(
+        self,
+        messages: t.List[_utils._BytesLike],
+    ) -> int:
+        return max(1, math.ceil(len(messages) / self.workers))
+
+    def _map(
+        self,
+        func: t.Callable[
+            [SecurityContext, t.List[_utils._BytesLike]], t.List[_T]
+        ],
+        messages: t.Iterable[_utils._BytesLike],
+        batch_size: int,
+    ) -> t.Iterator[_T]:
+        # keep a bounded number of batches in flight, and always collect
+        # the oldest one first to keep the results in order
+        max_pending = 2 * self.workers
+        pending: t.Deque[concurrent.futures.Future] = collections.deque()
+
+        if not self.concurrent_calls:
+            func = functools.partial(self._locked, func)
+
+        batch: t.List[_utils._BytesLike] = []
+        for message in messages:
+            batch.append(message)
+            if len(batch) >= batch_size:
+                pending.append(self._executor.submit(func, self.context,
+                                                     batch))
+                batch = []
+
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+
+        if batch:
+            pending.append(self._executor.submit(func, self.context, batch))
+
+        while pending:
+            yield from pending.popleft().result()
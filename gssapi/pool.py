@@ -0,0 +1,349 @@
+"""Security Context Pooling
+
+This module provides a pool of established initiating security contexts,
+for clients which repeatedly connect to the same services and can reuse an
+established security context on a new connection.
+"""
+
+import collections
+import contextlib
+import threading
+import typing as t
+import weakref
+
+from gssapi.names import Name
+from gssapi.raw import oids as roids
+from gssapi.sec_contexts import SecurityContext
+
+# (display name, name type, mech, flags)
+_Key = t.Tuple[bytes, t.Optional[roids.OID], t.Optional[roids.OID],
+               t.Optional[int]]
+_Target = t.Tuple[Name, t.Optional[roids.OID], t.Optional[int]]
+
+
+class ContextPool:
+    """A pool of established initiating security contexts
+
+    Contexts are kept per target name, mechanism and flags.  Checking out a
+    context returns an idle context for the same target if there is one
+    which won't expire within `min_lifetime` seconds, and otherwise
+    establishes a new one using the `establish` callback.  Contexts are
+    returned to the pool with :meth:`checkin`.
+
+    At most `max_per_key` idle contexts are kept for each target, and at
+    most `max_idle` idle contexts are kept in total, with the contexts of the
+    least recently used targets being evicted first.
+
+    Unless `background` is False, a background thread checks the idle
+    contexts every `check_interval` seconds, and replaces those which will
+    expire within `refresh_ahead` seconds with newly established ones
+    (see :meth:`refresh`), so that checking out a context rarely has to wait
+    for a handshake.
+
+    This class is thread-safe, and may be used as a context manager, in
+    which case it is closed when the block is exited.
+    """
+
+    def __init__(
+        self,
+        establish: t.Callable[[Name, t.Optional[roids.OID], t.Optional[int]],
+                              SecurityContext],
+        max_per_key: int = 4,
+        max_idle: int = 64,
+        min_lifetime: float = 30,
+        refresh_ahead: float = 300,
+        check_interval: float = 30,
+        background: bool = True,
+    ) -> None:
+        """
+        Args:
+            establish (callable): a callable which takes a target name,
+                mechanism and flags, and returns a new initiating security
+                context for that target, which has been fully established
+                with the service
+            max_per_key (int): the maximum number of idle contexts to keep
+                for each target
+            max_idle (int): the maximum number of idle contexts to keep in
+                total
+            min_lifetime (float): the minimum remaining lifetime, in seconds,
+                of contexts which are checked out
+            refresh_ahead (float): how long, in seconds, before they expire
+                idle contexts are replaced
+            check_interval (float): how often, in seconds, the background
+                thread checks the idle contexts
+            background (bool): whether to start the background thread
+        """
+
+        self.establish = establish
+        self.max_per_key = max_per_key
+        self.max_idle = max_idle
+        self.min_lifetime = min_lifetime
+        self.refresh_ahead = refresh_ahead
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        # least recently used targets first
+        self._idle: t.OrderedDict[
+            _Key, t.Deque[SecurityContext]
+        ] = collections.OrderedDict()
+        self._idle_count = 0
+        self._targets: t.Dict[_Key, _Target] = {}
+        self._checked_out: t.MutableMapping[
+            SecurityContext, _Key
+        ] = weakref.WeakKeyDictionary()
+        self._closed = False
+
+        self._stop = threading.Event()
+        self._thread: t.Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(target=self._maintain,
+                                            name='gssapi-context-pool',
+                                            daemon=True)
+            self._thread.start()
+
+    def checkout(
+        self,
+        name: Name,
+        mech: t.Optional[roids.OID] = None,
+        flags: t.Optional[int] = None,
+    ) -> SecurityContext:
+        """Check out an established security context for a target
+
+        Args:
+            name (~gssapi.names.Name): the target name
+            mech (OID): the mechanism, or None for the default mechanism
+            flags (int): the requested flags, or None for the default flags
+
+        Returns:
+            SecurityContext: an established security context, which should
+            be returned with :meth:`checkin` (or :meth:`discard`) when done
+
+        Raises:
+            ValueError: the pool has been closed
+            anything raised by the `establish` callback
+        """
+
+        key = self._key(name, mech, flags)
+
+        with self._lock:
+            if self._closed:
+                raise ValueError("The context pool has been closed")
+
+            idle = self._idle.get(key)
+            while idle:
+                # prefer the most recently used context
+                context = idle.pop()
+                self._idle_count -= 1
+                if not context.is_expiring(self.min_lifetime):
+                    if idle:
+                        self._idle.move_to_end(key)
+                    else:
+                        del self._idle[key]
+                    self._checked_out[context] = key
+                    return context
+
+            self._idle.pop(key, None)
+            self._drop_target(key)
+
+        context = self.establish(name, mech, flags)
+
+        with self._lock:
+            self._targets[key] = (name, mech, flags)
+            self._checked_out[context] = key
+
+        return context
+
+    def checkin(
+        self,
+        context: SecurityContext,
+    ) -> None:
+        """Return a security context to the pool
+
+        The context is kept if there is room for it and it isn't about
+        to expire.
+
+        Args:
+            context (SecurityContext): a context from :meth:`checkout`
+
+        Raises:
+            ValueError: the context was not checked out of this pool
+        """
+
+        with self._lock:
+            key = self._checked_out.pop(context, None)
+            if key is None:
+                raise ValueError("The security context was not checked out "
+                                 "of this pool")
+
+            if self._closed or context.is_expiring(self.min_lifetime):
+                self._drop_target(key)
+                return
+
+            self._add_idle(key, context)
+
+    def discard(
+        self,
+        context: SecurityContext,
+    ) -> None:
+        """Forget about a checked out security context
+
+        This should be used instead of :meth:`checkin` for contexts which
+        should not be reused, for instance because the connection they were
+        used on failed.
+
+        Args:
+            context (SecurityContext): a context from :meth:`checkout`
+        """
+
+        with self._lock:
+            key = self._checked_out.pop(context, None)
+            if key is not None:
+                self._drop_target(key)
+
+    @contextlib.contextmanager
+    def context(
+        self,
+        name: Name,
+        mech: t.Optional[roids.OID] = None,
+        flags: t.Optional[int] = None,
+    ) -> t.Iterator[SecurityContext]:
+        """Check out a security context for the duration of a block
+
+        The context is checked back in when the block exits normally, and
+        discarded if the block raises an exception.
+
+        Args:
+            name (~gssapi.names.Name): the target name
+            mech (OID): the mechanism, or None for the default mechanism
+            flags (int): the requested flags, or None for the default flags
+
+        Yields:
+            SecurityContext: an established security context
+        """
+
+        context = self.checkout(name, mech, flags)
+        try:
+            yield context
+        except BaseException:
+            self.discard(context)
+            raise
+        else:
+            self.checkin(context)
+
+    def refresh(self) -> None:
+        """Replace idle security contexts which are about to expire
+
+        Idle contexts which will expire within `refresh_ahead` seconds are
+        replaced with newly established ones, and those which will expire
+        within `min_lifetime` seconds are dropped.  This is called
+        periodically by the background thread.
+        """
+
+        with self._lock:
+            expiring = []
+            for key, idle in self._idle.items():
+                for context in list(idle):
+                    if context.is_expiring(self.min_lifetime):
+                        idle.remove(context)
+                        self._idle_count -= 1
+                    elif context.is_expiring(self.refresh_ahead):
+                        expiring.append((key, self._targets[key], context))
+
+            for key in [key for key, idle in self._idle.items() if not idle]:
+                del self._idle[key]
+
+            # also catches targets whose checked out contexts were garbage
+            # collected instead of being checked in
+            in_use = set(self._idle)
+            in_use.update(self._checked_out.values())
+            for key in [key for key in self._targets if key not in in_use]:
+                del self._targets[key]
+
+        for key, target, old_context in expiring:
+            if self._stop.is_set():
+                return
+
+            try:
+                new_context = self.establish(*target)
+            except Exception:
+                # leave the old context for now -- checkout will establish
+                # a new one itself once it's too close to expiring
+                continue
+
+            with self._lock:
+                if self._closed:
+                    return
+
+                old_idle = self._idle.get(key)
+                if old_idle is not None and old_context in old_idle:
+                    old_idle.remove(old_context)
+                    self._idle_count -= 1
+
+                self._targets[key] = target
+                self._add_idle(key, new_context)
+
+    def close(self) -> None:
+        """Stop the background thread and drop all idle contexts"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        with self._lock:
+            self._closed = True
+            self._idle.clear()
+            self._idle_count = 0
+            self._targets.clear()
+
+    def __enter__(self) -> "ContextPool":
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _key(
+        name: Name,
+        mech: t.Optional[roids.OID],
+        flags: t.Optional[int],
+    ) -> _Key:
+        return (bytes(name), name.name_type, mech,
+                int(flags) if flags is not None else None)
+
+    def _add_idle(
+        self,
+        key: _Key,
+        context: SecurityContext,
+    ) -> None:
+        # called with the lock held
+        idle = self._idle.setdefault(key, collections.deque())
+        self._idle.move_to_end(key)
+
+        if len(idle) >= self.max_per_key:
+            return
+
+        idle.append(context)
+        self._idle_count += 1
+
+        # evict the oldest contexts of the least recently used targets
+        while self._idle_count > self.max_idle:
+            lru_key, lru_idle = next(iter(self._idle.items()))
+            lru_idle.popleft()
+            self._idle_count -= 1
+            if not lru_idle:
+                del self._idle[lru_key]
+                self._drop_target(lru_key)
+
+    def _drop_target(
+        self,
+        key: _Key,
+    ) -> None:
+        # called with the lock held -- targets are only needed while they
+        # have idle or checked out contexts
+        if key not in self._idle and key not in self._checked_out.values():
+            self._targets.pop(key, None)
+
+    def _maintain(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            self.refresh()
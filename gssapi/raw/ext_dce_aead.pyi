@@ -2,13 +2,14 @@ import typing as t
 
 if t.TYPE_CHECKING:
     from gssapi.raw.named_tuples import WrapResult, UnwrapResult
+    from gssapi.raw.message import _BytesLike
     from gssapi.raw.sec_contexts import SecurityContext
 
 
 def wrap_aead(
     context: "SecurityContext",
-    message: bytes,
-    associated: t.Optional[bytes] = None,
+    message: "_BytesLike",
+    associated: t.Optional["_BytesLike"] = None,
     confidential: bool = True,
     qop: t.Optional[int] = None,
 ) -> "WrapResult":
@@ -20,8 +21,8 @@ def wrap_aead(
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message to wrap or encrypt
-        associated (bytes): associated data to go with the message
+        message (bytes-like): the message to wrap or encrypt
+        associated (bytes-like): associated data to go with the message
         confidential (bool): whether or not to encrypt the message (True),
             or just wrap it with a MIC (False)
         qop (int): the desired Quality of Protection
@@ -38,8 +39,8 @@ def wrap_aead(
 
 def unwrap_aead(
     context: "SecurityContext",
-    message: bytes,
-    associated: t.Optional[bytes] = None,
+    message: "_BytesLike",
+    associated: t.Optional["_BytesLike"] = None,
 ) -> "UnwrapResult":
     """Unwrap/Decrypt an AEAD message.
 
@@ -49,8 +50,8 @@ def unwrap_aead(
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the AEAD message to unwrap or decrypt
-        associated (bytes): associated data that goes with the message
+        message (bytes-like): the AEAD message to unwrap or decrypt
+        associated (bytes-like): associated data that goes with the message
 
     Returns:
         UnwrapResult: the unwrapped/decrypted message, whether or on
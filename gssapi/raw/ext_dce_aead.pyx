@@ -1,5 +1,8 @@
 GSSAPI="BASE"  # This ensures that a full module is generated by Cython
 
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release
+from cpython.buffer cimport PyBUF_SIMPLE
+
 from gssapi.raw.cython_types cimport *
 from gssapi.raw.sec_contexts cimport SecurityContext
 
@@ -21,17 +24,28 @@ cdef extern from "python_gssapi_ext.h":
                               int *conf_ret, gss_qop_t *qop_ret) nogil
 
 
-def wrap_aead(SecurityContext context not None, bytes message not None,
-              bytes associated=None, confidential=True, qop=None):
+def wrap_aead(SecurityContext context not None, message not None,
+              associated=None, confidential=True, qop=None):
     cdef int conf_req = confidential
     cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
-    cdef gss_buffer_desc message_buffer = gss_buffer_desc(len(message),
-                                                          message)
+
+    cdef Py_buffer message_view
+    cdef Py_buffer assoc_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    cdef gss_buffer_desc message_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
 
     cdef gss_buffer_t assoc_buffer_ptr = GSS_C_NO_BUFFER
     cdef gss_buffer_desc assoc_buffer
     if associated is not None:
-        assoc_buffer = gss_buffer_desc(len(associated), associated)
+        try:
+            PyObject_GetBuffer(associated, &assoc_view, PyBUF_SIMPLE)
+        except:
+            PyBuffer_Release(&message_view)
+            raise
+
+        assoc_buffer = gss_buffer_desc(assoc_view.len,
+                                       <char*>assoc_view.buf)
         assoc_buffer_ptr = &assoc_buffer
 
     cdef int conf_used
@@ -40,10 +54,16 @@ def wrap_aead(SecurityContext context not None, bytes message not None,
 
     cdef OM_uint32 maj_stat, min_stat
 
-    with nogil:
-        maj_stat = gss_wrap_aead(&min_stat, context.raw_ctx, conf_req, qop_req,
-                                 assoc_buffer_ptr, &message_buffer,
-                                 &conf_used, &output_buffer)
+    try:
+        with nogil:
+            maj_stat = gss_wrap_aead(&min_stat, context.raw_ctx, conf_req,
+                                     qop_req, assoc_buffer_ptr,
+                                     &message_buffer, &conf_used,
+                                     &output_buffer)
+    finally:
+        if associated is not None:
+            PyBuffer_Release(&assoc_view)
+        PyBuffer_Release(&message_view)
 
     if maj_stat == GSS_S_COMPLETE:
         output_message = (<char*>output_buffer.value)[:output_buffer.length]
@@ -53,14 +73,25 @@ def wrap_aead(SecurityContext context not None, bytes message not None,
         raise GSSError(maj_stat, min_stat)
 
 
-def unwrap_aead(SecurityContext context not None, bytes message not None,
-                bytes associated=None):
-    cdef gss_buffer_desc input_buffer = gss_buffer_desc(len(message), message)
+def unwrap_aead(SecurityContext context not None, message not None,
+                associated=None):
+    cdef Py_buffer message_view
+    cdef Py_buffer assoc_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    cdef gss_buffer_desc input_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
 
     cdef gss_buffer_t assoc_buffer_ptr = GSS_C_NO_BUFFER
     cdef gss_buffer_desc assoc_buffer
     if associated is not None:
-        assoc_buffer = gss_buffer_desc(len(associated), associated)
+        try:
+            PyObject_GetBuffer(associated, &assoc_view, PyBUF_SIMPLE)
+        except:
+            PyBuffer_Release(&message_view)
+            raise
+
+        assoc_buffer = gss_buffer_desc(assoc_view.len,
+                                       <char*>assoc_view.buf)
         assoc_buffer_ptr = &assoc_buffer
 
     # GSS_C_EMPTY_BUFFER
@@ -70,10 +101,16 @@ def unwrap_aead(SecurityContext context not None, bytes message not None,
 
     cdef OM_uint32 maj_stat, min_stat
 
-    with nogil:
-        maj_stat = gss_unwrap_aead(&min_stat, context.raw_ctx, &input_buffer,
-                                   assoc_buffer_ptr, &output_buffer,
-                                   &conf_state, &qop_state)
+    try:
+        with nogil:
+            maj_stat = gss_unwrap_aead(&min_stat, context.raw_ctx,
+                                       &input_buffer, assoc_buffer_ptr,
+                                       &output_buffer, &conf_state,
+                                       &qop_state)
+    finally:
+        if associated is not None:
+            PyBuffer_Release(&assoc_view)
+        PyBuffer_Release(&message_view)
 
     if maj_stat == GSS_S_COMPLETE:
         output_message = (<char*>output_buffer.value)[:output_buffer.length]
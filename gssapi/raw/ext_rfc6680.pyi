@@ -120,6 +120,33 @@ def get_name_attribute(
     """
 
 
+def get_name_attributes(
+    name: "Name",
+    attrs: t.Optional[t.Iterable[bytes]] = None,
+) -> t.Dict[bytes, "GetNameAttributeResult"]:
+    """Get the values of several name attributes.
+
+    This method retrieves all the values of each of the given attributes
+    (or of every attribute of the name, as listed by :func:`inquire_name`)
+    for the given Name, as if :func:`get_name_attribute` had been called
+    on each one, but in a single call.
+
+    Args:
+        name (~gssapi.raw.names.Name): the Name from which to get the
+            attributes
+        attrs (list): the names of the attributes, or None for all the
+            attributes of the name
+
+    Returns:
+        dict: the :class:`GetNameAttributeResult` for each attribute, keyed
+        by attribute name
+
+    Raises:
+        ~gssapi.exceptions.OperationUnavailableError: one of the given
+            attributes is unknown or unset
+    """
+
+
 def delete_name_attribute(
     name: "Name",
     attr: bytes,
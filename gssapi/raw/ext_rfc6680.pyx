@@ -120,6 +120,10 @@ def set_name_attribute(Name name not None, attr not None, value not None,
 
 
 def get_name_attribute(Name name not None, attr not None, more=None):
+    return _get_name_attribute(name, attr)
+
+
+cdef _get_name_attribute(Name name, attr):
     cdef gss_buffer_desc attr_buff = gss_buffer_desc(len(attr), attr)
 
     cdef gss_buffer_desc val_buff = gss_buffer_desc(0, NULL)
@@ -154,6 +158,13 @@ def get_name_attribute(Name name not None, attr not None, more=None):
                                   <bint>complete)
 
 
+def get_name_attributes(Name name not None, attrs=None):
+    if attrs is None:
+        attrs = inquire_name(name, mech_name=False, attrs=True).attrs
+
+    return {attr: _get_name_attribute(name, attr) for attr in attrs}
+
+
 def delete_name_attribute(Name name not None, attr not None):
     cdef gss_buffer_desc attr_buff = gss_buffer_desc(len(attr), attr)
 
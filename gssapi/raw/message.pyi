@@ -1,13 +1,18 @@
 import typing as t
 
 if t.TYPE_CHECKING:
+    from gssapi.raw.misc import GSSError
     from gssapi.raw.named_tuples import WrapResult, UnwrapResult
+    from gssapi.raw.named_tuples import WrapIntoResult, UnwrapIntoResult
     from gssapi.sec_contexts import SecurityContext
 
+# NB: messages may be any C-contiguous object supporting the buffer protocol
+_BytesLike = t.Union[bytes, bytearray, memoryview]
+
 
 def get_mic(
     context: "SecurityContext",
-    message: bytes,
+    message: _BytesLike,
     qop: t.Optional[int] = None,
 ) -> bytes:
     """Generate a MIC for a message.
@@ -20,7 +25,7 @@ def get_mic(
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message for which to generate the MIC
+        message (bytes-like): the message for which to generate the MIC
         qop (int): the requested Quality of Protection
             (or None to use the default)
 
@@ -36,8 +41,8 @@ def get_mic(
 
 def verify_mic(
     context: "SecurityContext",
-    message: bytes,
-    token: bytes,
+    message: _BytesLike,
+    token: _BytesLike,
 ) -> int:
     """Verify that a MIC matches a message.
 
@@ -48,8 +53,8 @@ def verify_mic(
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message in question
-        token (bytes): the MIC token in question
+        message (bytes-like): the message in question
+        token (bytes-like): the MIC token in question
 
     Returns:
         int: the QoP used.
@@ -97,7 +102,7 @@ def wrap_size_limit(
 
 def wrap(
     context: "SecurityContext",
-    message: bytes,
+    message: _BytesLike,
     confidential: bool = True,
     qop: t.Optional[int] = None,
 ) -> "WrapResult":
@@ -109,7 +114,7 @@ def wrap(
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message to wrap or encrypt
+        message (bytes-like): the message to wrap or encrypt
         confidential (bool): whether or not to encrypt the message (True),
             or just wrap it with a MIC (False)
         qop (int): the desired Quality of Protection
@@ -128,7 +133,7 @@ def wrap(
 
 def unwrap(
     context: "SecurityContext",
-    message: bytes,
+    message: _BytesLike,
 ) -> "UnwrapResult":
     """Unwrap/Decrypt a message.
 
@@ -138,7 +143,7 @@ def unwrap(
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message to unwrap/decrypt
+        message (bytes-like): the message to unwrap/decrypt
 
     Returns:
         UnwrapResult: the unwrapped/decrypted message, whether or on
@@ -154,3 +159,141 @@ def unwrap(
         ~gssapi.exceptions.ExpiredContextError
         ~gssapi.exceptions.MissingContextError
     """
+
+
+def wrap_into(
+    context: "SecurityContext",
+    message: _BytesLike,
+    out: _BytesLike,
+    confidential: bool = True,
+    qop: t.Optional[int] = None,
+) -> "WrapIntoResult":
+    """Wrap/Encrypt a message into a caller-provided buffer.
+
+    This method works like :func:`wrap`, except that the wrapped message
+    is written to the start of the given writable buffer instead of being
+    returned as a new :class:`bytes` object.  This allows a single
+    preallocated buffer to be reused for many messages.
+
+    The message may be at most as long as :func:`wrap_size_limit` allows
+    for the length of the output buffer (and the same `confidential` and
+    `qop` values).  This is checked before the message is wrapped, so a
+    :class:`ValueError` for a buffer which is too small leaves the
+    sequence state of the context untouched.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        message (bytes-like): the message to wrap or encrypt
+        out (bytes-like): the writable, contiguous buffer (e.g. a
+            :class:`bytearray`) into which to write the wrapped message
+        confidential (bool): whether or not to encrypt the message (True),
+            or just wrap it with a MIC (False)
+        qop (int): the desired Quality of Protection
+            (or None for the default QoP)
+
+    Returns:
+        WrapIntoResult: the number of bytes written to the output buffer,
+            and whether or not encryption was actually used
+
+    Raises:
+        ~gssapi.exceptions.ExpiredContextError
+        ~gssapi.exceptions.MissingContextError
+        ~gssapi.exceptions.BadQoPError
+        ValueError: the output buffer was too small
+    """
+
+
+def unwrap_into(
+    context: "SecurityContext",
+    message: _BytesLike,
+    out: _BytesLike,
+) -> "UnwrapIntoResult":
+    """Unwrap/Decrypt a message into a caller-provided buffer.
+
+    This method works like :func:`unwrap`, except that the unwrapped
+    message is written to the start of the given writable buffer instead
+    of being returned as a new :class:`bytes` object.  This allows a single
+    preallocated buffer to be reused for many messages.
+
+    An output buffer at least as large as the wrapped message is always
+    large enough to hold the unwrapped message.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        message (bytes-like): the message to unwrap/decrypt
+        out (bytes-like): the writable, contiguous buffer (e.g. a
+            :class:`bytearray`) into which to write the unwrapped message
+
+    Returns:
+        UnwrapIntoResult: the number of bytes written to the output buffer,
+            whether or not encryption was used, and the QoP used
+
+    Raises:
+        ~gssapi.exceptions.InvalidTokenError
+        ~gssapi.exceptions.BadMICError
+        ~gssapi.exceptions.DuplicateTokenError
+        ~gssapi.exceptions.ExpiredTokenError
+        ~gssapi.exceptions.TokenTooLateError
+        ~gssapi.exceptions.TokenTooEarlyError
+        ~gssapi.exceptions.ExpiredContextError
+        ~gssapi.exceptions.MissingContextError
+        ValueError: the output buffer was too small
+    """
+
+
+def wrap_many(
+    context: "SecurityContext",
+    messages: t.Iterable[_BytesLike],
+    confidential: bool = True,
+    qop: t.Optional[int] = None,
+) -> t.List[t.Union["WrapResult", "GSSError"]]:
+    """Wrap/Encrypt a series of messages.
+
+    This method wraps or encrypts each of the given messages in order, as
+    if :func:`wrap` had been called on each one, but does so while releasing
+    the GIL only once for the whole batch.
+
+    A failure to wrap one message does not stop the rest of the batch from
+    being processed: the corresponding result is the
+    :class:`~gssapi.raw.misc.GSSError` instance that would have been raised.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        messages (list): the messages (bytes-like) to wrap or encrypt
+        confidential (bool): whether or not to encrypt the messages (True),
+            or just wrap them with a MIC (False)
+        qop (int): the desired Quality of Protection
+            (or None for the default QoP)
+
+    Returns:
+        list: a :class:`WrapResult` or :class:`~gssapi.raw.misc.GSSError` for
+            each input message, in the same order
+    """
+
+
+def unwrap_many(
+    context: "SecurityContext",
+    messages: t.Iterable[_BytesLike],
+) -> t.List[t.Union["UnwrapResult", "GSSError"]]:
+    """Unwrap/Decrypt a series of messages.
+
+    This method unwraps or decrypts each of the given messages in order, as
+    if :func:`unwrap` had been called on each one, but does so while
+    releasing the GIL only once for the whole batch.
+
+    A failure to unwrap one message does not stop the rest of the batch from
+    being processed: the corresponding result is the
+    :class:`~gssapi.raw.misc.GSSError` instance that would have been raised.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        messages (list): the messages (bytes-like) to unwrap/decrypt
+
+    Returns:
+        list: an :class:`UnwrapResult` or :class:`~gssapi.raw.misc.GSSError`
+            for each input message, in the same order
+    """
@@ -1,10 +1,16 @@
 GSSAPI="BASE"  # This ensures that a full module is generated by Cython
 
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release
+from cpython.buffer cimport PyBUF_SIMPLE, PyBUF_WRITABLE
+from libc.stdlib cimport calloc, free
+from libc.string cimport memcpy
+
 from gssapi.raw.cython_types cimport *
 from gssapi.raw.sec_contexts cimport SecurityContext
 
 from gssapi.raw.misc import GSSError
 from gssapi.raw.named_tuples import WrapResult, UnwrapResult
+from gssapi.raw.named_tuples import WrapIntoResult, UnwrapIntoResult
 
 
 cdef extern from "python_gssapi.h":
@@ -43,6 +49,17 @@ cdef extern from "python_gssapi.h":
                          gss_qop_t *qop) nogil
 
 
+# per-message state for the batched wrap/unwrap functions
+cdef struct _message_state:
+    Py_buffer input_view
+    gss_buffer_desc input_buffer
+    gss_buffer_desc output_buffer
+    int conf_state
+    gss_qop_t qop_state
+    OM_uint32 maj_stat
+    OM_uint32 min_stat
+
+
 def get_mic(SecurityContext context not None, message, qop=None):
     """
     get_mic(context, message, qop=None)
@@ -56,7 +73,7 @@ def get_mic(SecurityContext context not None, message, qop=None):
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message for which to generate the MIC
+        message (bytes-like): the message for which to generate the MIC
         qop (int): the requested Quality of Protection
             (or None to use the default)
 
@@ -69,18 +86,24 @@ def get_mic(SecurityContext context not None, message, qop=None):
         ~gssapi.exceptions.BadQoPError
     """
 
-    cdef gss_buffer_desc message_buffer = gss_buffer_desc(len(message),
-                                                          message)
     cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
 
+    cdef Py_buffer message_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    cdef gss_buffer_desc message_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
+
     # GSS_C_EMPYT_BUFFER
     cdef gss_buffer_desc token_buffer = gss_buffer_desc(0, NULL)
 
     cdef OM_uint32 maj_stat, min_stat
 
-    with nogil:
-        maj_stat = gss_get_mic(&min_stat, context.raw_ctx, qop_req,
-                               &message_buffer, &token_buffer)
+    try:
+        with nogil:
+            maj_stat = gss_get_mic(&min_stat, context.raw_ctx, qop_req,
+                                   &message_buffer, &token_buffer)
+    finally:
+        PyBuffer_Release(&message_view)
 
     if maj_stat == GSS_S_COMPLETE:
         res = (<char*>token_buffer.value)[:token_buffer.length]
@@ -102,8 +125,8 @@ def verify_mic(SecurityContext context not None, message, token):
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message in question
-        token (bytes): the MIC token in question
+        message (bytes-like): the message in question
+        token (bytes-like): the MIC token in question
 
     Returns:
         int: the QoP used.
@@ -119,17 +142,32 @@ def verify_mic(SecurityContext context not None, message, token):
         ~gssapi.exceptions.MissingContextError
     """
 
-    cdef gss_buffer_desc message_buffer = gss_buffer_desc(len(message),
-                                                          message)
-    cdef gss_buffer_desc token_buffer = gss_buffer_desc(len(token), token)
+    cdef Py_buffer message_view
+    cdef Py_buffer token_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    try:
+        PyObject_GetBuffer(token, &token_view, PyBUF_SIMPLE)
+    except:
+        PyBuffer_Release(&message_view)
+        raise
+
+    cdef gss_buffer_desc message_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
+    cdef gss_buffer_desc token_buffer = gss_buffer_desc(
+        token_view.len, <char*>token_view.buf)
 
     cdef gss_qop_t qop_state
 
     cdef OM_uint32 maj_stat, min_stat
 
-    with nogil:
-        maj_stat = gss_verify_mic(&min_stat, context.raw_ctx, &message_buffer,
-                                  &token_buffer, &qop_state)
+    try:
+        with nogil:
+            maj_stat = gss_verify_mic(&min_stat, context.raw_ctx,
+                                      &message_buffer, &token_buffer,
+                                      &qop_state)
+    finally:
+        PyBuffer_Release(&token_view)
+        PyBuffer_Release(&message_view)
 
     if maj_stat == GSS_S_COMPLETE:
         return qop_state
@@ -192,7 +230,7 @@ def wrap(SecurityContext context not None, message, confidential=True,
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message to wrap or encrypt
+        message (bytes-like): the message to wrap or encrypt
         confidential (bool): whether or not to encrypt the message (True),
             or just wrap it with a MIC (False)
         qop (int): the desired Quality of Protection
@@ -210,8 +248,11 @@ def wrap(SecurityContext context not None, message, confidential=True,
 
     cdef int conf_req = confidential
     cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
-    cdef gss_buffer_desc message_buffer = gss_buffer_desc(len(message),
-                                                          message)
+
+    cdef Py_buffer message_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    cdef gss_buffer_desc message_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
 
     cdef int conf_used
     # GSS_C_EMPTY_BUFFER
@@ -219,9 +260,12 @@ def wrap(SecurityContext context not None, message, confidential=True,
 
     cdef OM_uint32 maj_stat, min_stat
 
-    with nogil:
-        maj_stat = gss_wrap(&min_stat, context.raw_ctx, conf_req, qop_req,
-                            &message_buffer, &conf_used, &output_buffer)
+    try:
+        with nogil:
+            maj_stat = gss_wrap(&min_stat, context.raw_ctx, conf_req, qop_req,
+                                &message_buffer, &conf_used, &output_buffer)
+    finally:
+        PyBuffer_Release(&message_view)
 
     if maj_stat == GSS_S_COMPLETE:
         output_message = (<char*>output_buffer.value)[:output_buffer.length]
@@ -242,7 +286,7 @@ def unwrap(SecurityContext context not None, message):
     Args:
         context (~gssapi.raw.sec_contexts.SecurityContext): the current
             security context
-        message (bytes): the message to unwrap/decrypt
+        message (bytes-like): the message to unwrap/decrypt
 
     Returns:
         UnwrapResult: the unwrapped/decrypted message, whether or on
@@ -259,7 +303,10 @@ def unwrap(SecurityContext context not None, message):
         ~gssapi.exceptions.MissingContextError
     """
 
-    cdef gss_buffer_desc input_buffer = gss_buffer_desc(len(message), message)
+    cdef Py_buffer message_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    cdef gss_buffer_desc input_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
 
     # GSS_C_EMPTY_BUFFER
     cdef gss_buffer_desc output_buffer = gss_buffer_desc(0, NULL)
@@ -268,9 +315,12 @@ def unwrap(SecurityContext context not None, message):
 
     cdef OM_uint32 maj_stat, min_stat
 
-    with nogil:
-        maj_stat = gss_unwrap(&min_stat, context.raw_ctx, &input_buffer,
-                              &output_buffer, &conf_state, &qop_state)
+    try:
+        with nogil:
+            maj_stat = gss_unwrap(&min_stat, context.raw_ctx, &input_buffer,
+                                  &output_buffer, &conf_state, &qop_state)
+    finally:
+        PyBuffer_Release(&message_view)
 
     if maj_stat == GSS_S_COMPLETE:
         output_message = (<char*>output_buffer.value)[:output_buffer.length]
@@ -278,3 +328,341 @@ def unwrap(SecurityContext context not None, message):
         return UnwrapResult(output_message, <bint>conf_state, qop_state)
     else:
         raise GSSError(maj_stat, min_stat)
+
+
+cdef size_t _copy_into(gss_buffer_t src, Py_buffer *dst) except? 0:
+    # NB: this always releases the source buffer, even on failure
+    cdef OM_uint32 tmp_min_stat
+    cdef size_t length = src.length
+    if length > <size_t>dst.len:
+        gss_release_buffer(&tmp_min_stat, src)
+        raise ValueError("The output buffer is too small: {0} bytes are "
+                         "required, but only {1} are "
+                         "available".format(length, dst.len))
+
+    if length:
+        memcpy(dst.buf, src.value, length)
+    gss_release_buffer(&tmp_min_stat, src)
+
+    return length
+
+
+def wrap_into(SecurityContext context not None, message, out,
+              confidential=True, qop=None):
+    """
+    wrap_into(context, message, out, confidential=True, qop=None)
+    Wrap/Encrypt a message into a caller-provided buffer.
+
+    This method works like :func:`wrap`, except that the wrapped message
+    is written to the start of the given writable buffer instead of being
+    returned as a new :class:`bytes` object.  This allows a single
+    preallocated buffer to be reused for many messages.
+
+    The message may be at most as long as :func:`wrap_size_limit` allows
+    for the length of the output buffer (and the same `confidential` and
+    `qop` values).  This is checked before the message is wrapped, so a
+    :class:`ValueError` for a buffer which is too small leaves the
+    sequence state of the context untouched.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        message (bytes-like): the message to wrap or encrypt
+        out (bytes-like): the writable, contiguous buffer (e.g. a
+            :class:`bytearray`) into which to write the wrapped message
+        confidential (bool): whether or not to encrypt the message (True),
+            or just wrap it with a MIC (False)
+        qop (int): the desired Quality of Protection
+            (or None for the default QoP)
+
+    Returns:
+        WrapIntoResult: the number of bytes written to the output buffer,
+            and whether or not encryption was actually used
+
+    Raises:
+        ~gssapi.exceptions.ExpiredContextError
+        ~gssapi.exceptions.MissingContextError
+        ~gssapi.exceptions.BadQoPError
+        ValueError: the output buffer was too small
+    """
+
+    cdef int conf_req = confidential
+    cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
+
+    cdef Py_buffer message_view
+    cdef Py_buffer out_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    try:
+        PyObject_GetBuffer(out, &out_view, PyBUF_WRITABLE)
+    except:
+        PyBuffer_Release(&message_view)
+        raise
+
+    cdef gss_buffer_desc message_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
+
+    cdef int conf_used
+    # GSS_C_EMPTY_BUFFER
+    cdef gss_buffer_desc output_buffer = gss_buffer_desc(0, NULL)
+
+    cdef OM_uint32 output_size = <OM_uint32>min(<size_t>out_view.len,
+                                                <size_t>0xFFFFFFFF)
+    cdef OM_uint32 max_input_size
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    try:
+        # check the size first: once gss_wrap has been called, the message
+        # counts against the sequence state of the context, even if it
+        # can't be returned
+        with nogil:
+            maj_stat = gss_wrap_size_limit(&min_stat, context.raw_ctx,
+                                           conf_req, qop_req, output_size,
+                                           &max_input_size)
+
+        if maj_stat != GSS_S_COMPLETE:
+            raise GSSError(maj_stat, min_stat)
+
+        if <size_t>message_view.len > max_input_size:
+            raise ValueError("The output buffer is too small: it can hold a "
+                             "message of at most {0} bytes, but the message "
+                             "is {1} bytes long".format(max_input_size,
+                                                        message_view.len))
+
+        with nogil:
+            maj_stat = gss_wrap(&min_stat, context.raw_ctx, conf_req, qop_req,
+                                &message_buffer, &conf_used, &output_buffer)
+
+        if maj_stat == GSS_S_COMPLETE:
+            return WrapIntoResult(_copy_into(&output_buffer, &out_view),
+                                  <bint>conf_used)
+        else:
+            raise GSSError(maj_stat, min_stat)
+    finally:
+        PyBuffer_Release(&out_view)
+        PyBuffer_Release(&message_view)
+
+
+def unwrap_into(SecurityContext context not None, message, out):
+    """
+    unwrap_into(context, message, out)
+    Unwrap/Decrypt a message into a caller-provided buffer.
+
+    This method works like :func:`unwrap`, except that the unwrapped
+    message is written to the start of the given writable buffer instead
+    of being returned as a new :class:`bytes` object.  This allows a single
+    preallocated buffer to be reused for many messages.
+
+    An output buffer at least as large as the wrapped message is always
+    large enough to hold the unwrapped message.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        message (bytes-like): the message to unwrap/decrypt
+        out (bytes-like): the writable, contiguous buffer (e.g. a
+            :class:`bytearray`) into which to write the unwrapped message
+
+    Returns:
+        UnwrapIntoResult: the number of bytes written to the output buffer,
+            whether or not encryption was used, and the QoP used
+
+    Raises:
+        ~gssapi.exceptions.InvalidTokenError
+        ~gssapi.exceptions.BadMICError
+        ~gssapi.exceptions.DuplicateTokenError
+        ~gssapi.exceptions.ExpiredTokenError
+        ~gssapi.exceptions.TokenTooLateError
+        ~gssapi.exceptions.TokenTooEarlyError
+        ~gssapi.exceptions.ExpiredContextError
+        ~gssapi.exceptions.MissingContextError
+        ValueError: the output buffer was too small
+    """
+
+    cdef Py_buffer message_view
+    cdef Py_buffer out_view
+    PyObject_GetBuffer(message, &message_view, PyBUF_SIMPLE)
+    try:
+        PyObject_GetBuffer(out, &out_view, PyBUF_WRITABLE)
+    except:
+        PyBuffer_Release(&message_view)
+        raise
+
+    cdef gss_buffer_desc input_buffer = gss_buffer_desc(
+        message_view.len, <char*>message_view.buf)
+
+    # GSS_C_EMPTY_BUFFER
+    cdef gss_buffer_desc output_buffer = gss_buffer_desc(0, NULL)
+    cdef int conf_state
+    cdef gss_qop_t qop_state
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    try:
+        with nogil:
+            maj_stat = gss_unwrap(&min_stat, context.raw_ctx, &input_buffer,
+                                  &output_buffer, &conf_state, &qop_state)
+
+        if maj_stat == GSS_S_COMPLETE:
+            return UnwrapIntoResult(_copy_into(&output_buffer, &out_view),
+                                    <bint>conf_state, qop_state)
+        else:
+            raise GSSError(maj_stat, min_stat)
+    finally:
+        PyBuffer_Release(&out_view)
+        PyBuffer_Release(&message_view)
+
+cdef _message_state *_alloc_message_states(messages) except NULL:
+    cdef size_t count = len(messages)
+    cdef _message_state *states = <_message_state *>calloc(
+        count or 1, sizeof(_message_state))
+    if states is NULL:
+        raise MemoryError()
+
+    cdef size_t i
+    try:
+        for i in range(count):
+            PyObject_GetBuffer(messages[i], &states[i].input_view,
+                               PyBUF_SIMPLE)
+            states[i].input_buffer.length = states[i].input_view.len
+            states[i].input_buffer.value = <char*>states[i].input_view.buf
+    except:
+        _free_message_states(states, count)
+        raise
+
+    return states
+
+
+cdef void _free_message_states(_message_state *states, size_t count):
+    cdef OM_uint32 tmp_min_stat
+    cdef size_t i
+    for i in range(count):
+        # NB: a no-op for views which were never acquired
+        PyBuffer_Release(&states[i].input_view)
+        if states[i].output_buffer.value is not NULL:
+            gss_release_buffer(&tmp_min_stat, &states[i].output_buffer)
+
+    free(states)
+
+
+def wrap_many(SecurityContext context not None, messages, confidential=True,
+              qop=None):
+    """
+    wrap_many(context, messages, confidential=True, qop=None)
+    Wrap/Encrypt a series of messages.
+
+    This method wraps or encrypts each of the given messages in order, as
+    if :func:`wrap` had been called on each one, but does so while releasing
+    the GIL only once for the whole batch.
+
+    A failure to wrap one message does not stop the rest of the batch from
+    being processed: the corresponding result is the
+    :class:`~gssapi.raw.misc.GSSError` instance that would have been raised.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        messages (list): the messages (bytes-like) to wrap or encrypt
+        confidential (bool): whether or not to encrypt the messages (True),
+            or just wrap them with a MIC (False)
+        qop (int): the desired Quality of Protection
+            (or None for the default QoP)
+
+    Returns:
+        list: a :class:`WrapResult` or :class:`~gssapi.raw.misc.GSSError` for
+            each input message, in the same order
+    """
+
+    cdef int conf_req = confidential
+    cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
+
+    messages = list(messages)
+    cdef size_t count = len(messages)
+    cdef _message_state *states = _alloc_message_states(messages)
+
+    cdef size_t i
+    try:
+        with nogil:
+            for i in range(count):
+                states[i].maj_stat = gss_wrap(&states[i].min_stat,
+                                              context.raw_ctx, conf_req,
+                                              qop_req,
+                                              &states[i].input_buffer,
+                                              &states[i].conf_state,
+                                              &states[i].output_buffer)
+
+        res = []
+        for i in range(count):
+            if states[i].maj_stat == GSS_S_COMPLETE:
+                output_message = (<char*>states[i].output_buffer.value)[
+                    :states[i].output_buffer.length]
+                res.append(WrapResult(output_message,
+                                      <bint>states[i].conf_state))
+            else:
+                err = GSSError(states[i].maj_stat, states[i].min_stat)
+                # the minor status message may depend on thread-local
+                # state, and the results may be used in another thread
+                err._generate_message()
+                res.append(err)
+
+        return res
+    finally:
+        _free_message_states(states, count)
+
+
+def unwrap_many(SecurityContext context not None, messages):
+    """
+    unwrap_many(context, messages)
+    Unwrap/Decrypt a series of messages.
+
+    This method unwraps or decrypts each of the given messages in order, as
+    if :func:`unwrap` had been called on each one, but does so while
+    releasing the GIL only once for the whole batch.
+
+    A failure to unwrap one message does not stop the rest of the batch from
+    being processed: the corresponding result is the
+    :class:`~gssapi.raw.misc.GSSError` instance that would have been raised.
+
+    Args:
+        context (~gssapi.raw.sec_contexts.SecurityContext): the current
+            security context
+        messages (list): the messages (bytes-like) to unwrap/decrypt
+
+    Returns:
+        list: an :class:`UnwrapResult` or :class:`~gssapi.raw.misc.GSSError`
+            for each input message, in the same order
+    """
+
+    messages = list(messages)
+    cdef size_t count = len(messages)
+    cdef _message_state *states = _alloc_message_states(messages)
+
+    cdef size_t i
+    try:
+        with nogil:
+            for i in range(count):
+                states[i].maj_stat = gss_unwrap(&states[i].min_stat,
+                                                context.raw_ctx,
+                                                &states[i].input_buffer,
+                                                &states[i].output_buffer,
+                                                &states[i].conf_state,
+                                                &states[i].qop_state)
+
+        res = []
+        for i in range(count):
+            if states[i].maj_stat == GSS_S_COMPLETE:
+                output_message = (<char*>states[i].output_buffer.value)[
+                    :states[i].output_buffer.length]
+                res.append(UnwrapResult(output_message,
+                                        <bint>states[i].conf_state,
+                                        states[i].qop_state))
+            else:
+                err = GSSError(states[i].maj_stat, states[i].min_stat)
+                # the minor status message may depend on thread-local
+                # state, and the results may be used in another thread
+                err._generate_message()
+                res.append(err)
+
+        return res
+    finally:
+        _free_message_states(states, count)
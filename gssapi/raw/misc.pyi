@@ -98,6 +98,15 @@ class GSSError(Exception):
     returned by the method which caused the error, and can
     generate human-readable string messages from the error
     codes
+
+    The messages are generated when they are first needed.  Since some
+    mechanisms (such as MIT krb5) only keep the details of the last error
+    for the thread it occurred in, the message of an error which is
+    passed to another thread may lack those details, unless it was
+    generated first.  The errors returned by the batch functions (such as
+    :func:`~gssapi.raw.message.wrap_many`) and raised by
+    :meth:`~gssapi.sec_contexts.SecurityContext.astep` already have their
+    messages generated.
     """
 
     maj_code: int
@@ -113,6 +122,8 @@ class GSSError(Exception):
         maj_code: int
     ) -> t.Tuple[int, int, int]: ...
 
+    def _generate_message(self) -> None: ...
+
     def __init__(
         self,
         maj_code: int,
@@ -122,10 +133,10 @@ class GSSError(Exception):
         """
         Create a new GSSError.
 
-        This method creates a new GSSError,
-        retrieves the related human-readable
-        string messages, and uses the results to construct an
-        exception message
+        This method creates a new GSSError.  The related human-readable
+        string messages are only retrieved when the exception message is
+        first needed (e.g. when the exception is converted to a string),
+        since this is relatively expensive.
 
         Args:
             maj_code: the major code associated with this error
@@ -111,6 +111,10 @@ def _display_status(unsigned int error_code, bint is_major_code,
 class GSSErrorRegistry(type):
     __registry = {}
 
+    # the error class (or None) for each full major code, precomputed for
+    # the registered combinations and filled in for others as they're seen
+    __lookup = {}
+
     def __init__(cls, name, bases, attributes):
         calling_code = getattr(cls, 'CALLING_CODE', None)
         routine_code = getattr(cls, 'ROUTINE_CODE', None)
@@ -131,6 +135,19 @@ class GSSErrorRegistry(type):
 
             routine_reg[supplementary_code] = cls
 
+            cls.__build_lookup()
+
+    def __build_lookup(cls):
+        lookup = cls.__lookup
+        lookup.clear()
+
+        for calling_code, call_reg in cls.__registry.items():
+            for routine_code, routine_reg in call_reg.items():
+                for supplementary_code in routine_reg:
+                    maj_code = ((calling_code or 0) | (routine_code or 0) |
+                                (supplementary_code or 0))
+                    lookup[maj_code] = cls.__find_error(maj_code)
+
     @staticmethod
     def __get_registry(code, parent_reg):
         return parent_reg.get(code, parent_reg.get(None, {}))
@@ -145,12 +162,25 @@ class GSSErrorRegistry(type):
         return routine_reg.get(suppl_code, routine_reg.get(None, None))
 
     def __call__(cls, maj_code, min_code, *args, **kwargs):
-        new_cls = cls.__find_error(maj_code) or cls
+        try:
+            new_cls = cls.__lookup[maj_code]
+        except KeyError:
+            new_cls = cls.__lookup[maj_code] = cls.__find_error(maj_code)
+
+        new_cls = new_cls or cls
 
         return super(GSSErrorRegistry, new_cls).__call__(maj_code, min_code,
                                                          *args, **kwargs)
 
 
+# the messages for status codes, keyed by (code, is_major, mech)
+_status_strings = {}
+
+# the underlying storage for exception arguments, which GSSError
+# fills in lazily
+_exception_args = BaseException.args
+
+
 # NB(directxman12): this needs to be here (and not in another file)
 #                   so that display_status can use it
 class GSSError(Exception, metaclass=GSSErrorRegistry):
@@ -180,9 +210,47 @@ class GSSError(Exception, metaclass=GSSErrorRegistry):
         self.routine_code = split_codes[1]
         self.supplementary_code = split_codes[2]
 
-        super(GSSError, self).__init__(self.gen_message())
+        # NB: the message is only generated when it's first needed, since
+        #     many errors are caught and handled without ever being displayed.
+        #     Minor status messages may depend on thread-local state (e.g.
+        #     with MIT krb5), so errors which are handed to another thread
+        #     should have _generate_message called first.
+        self._message_generated = False
+        super(GSSError, self).__init__()
+
+    def _generate_message(self):
+        if not getattr(self, '_message_generated', True):
+            self._message_generated = True
+            _exception_args.__set__(self, (self.gen_message(),))
+
+    @property
+    def args(self):
+        self._generate_message()
+        return _exception_args.__get__(self)
+
+    @args.setter
+    def args(self, value):
+        self._message_generated = True
+        _exception_args.__set__(self, value)
+
+    def __str__(self):
+        self._generate_message()
+        return super(GSSError, self).__str__()
+
+    def __repr__(self):
+        self._generate_message()
+        return super(GSSError, self).__repr__()
 
     def get_all_statuses(self, code, is_maj):
+        # NB: only major status messages are cached -- minor status messages
+        #     are mechanism-specific, and may include details of the last
+        #     error that occurred in this thread (e.g. with MIT krb5)
+        cache_key = (code, is_maj, None)
+        if is_maj:
+            cached = _status_strings.get(cache_key)
+            if cached is not None:
+                return list(cached)
+
         try:
             msg_encoding = locale.getlocale(locale.LC_MESSAGES)[1] or 'UTF-8'
         except AttributeError:  # Windows doesn't have LC_MESSAGES
@@ -205,6 +273,9 @@ class GSSError(Exception, metaclass=GSSErrorRegistry):
                 res.append(u'{0}  Decoding code: {1}'.format(e, code))
                 cont = False
 
+        if is_maj:
+            _status_strings[cache_key] = tuple(res)
+
         return res
 
     def gen_message(self):
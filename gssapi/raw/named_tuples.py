@@ -79,6 +79,24 @@ class UnwrapResult(NamedTuple):
     qop: int
 
 
+class WrapIntoResult(NamedTuple):
+    """Result of wrapping a message into a caller-provided buffer."""
+    #: The number of bytes written to the output buffer
+    length: int
+    #: Whether the message is encrypted and not just signed
+    encrypted: bool
+
+
+class UnwrapIntoResult(NamedTuple):
+    """Result of unwrapping a message into a caller-provided buffer."""
+    #: The number of bytes written to the output buffer
+    length: int
+    #: Whether the message was encrypted and not just signed
+    encrypted: bool
+    #: The quality of protection applied to the message
+    qop: int
+
+
 class AcceptSecContextResult(NamedTuple):
     """Result when accepting a security context by an initiator."""
     #: The acceptor security context
@@ -1,6 +1,7 @@
 import typing as t
 
 if t.TYPE_CHECKING:
+    from gssapi.raw.misc import GSSError
     from gssapi.raw.named_tuples import DisplayNameResult
     from gssapi.raw.oids import OID
 
@@ -168,3 +169,54 @@ def release_name(
     Raises:
         ~gssapi.exceptions.BadNameError
     """
+
+
+def canonicalize_names(
+    names: t.Iterable[Name],
+    mech: "OID",
+) -> t.List[t.Union[Name, "GSSError"]]:
+    """Canonicalize a series of GSSAPI Names into Mechanism Names
+
+    This method canonicalizes each of the given names in order, as if
+    :func:`canonicalize_name` had been called on each one, but does so while
+    releasing the GIL only once for the whole batch.
+
+    A failure to canonicalize one name does not stop the rest of the batch
+    from being processed: the corresponding result is the
+    :class:`~gssapi.raw.misc.GSSError` instance that would have been raised.
+
+    Args:
+        names (list): the names (:class:`~gssapi.raw.names.Name`) to
+            canonicalize
+        mech (~gssapi.raw.types.MechType): the mechanism type to use to
+            canonicalize the names
+
+    Returns:
+        list: a canonicalized :class:`Name` or
+            :class:`~gssapi.raw.misc.GSSError` for each input name, in the
+            same order
+    """
+
+
+def export_names(
+    names: t.Iterable[Name],
+) -> t.List[t.Union[bytes, "GSSError"]]:
+    """Export a series of GSSAPI names.
+
+    This method exports each of the given names in order, as if
+    :func:`export_name` had been called on each one, but does so while
+    releasing the GIL only once for the whole batch.
+
+    A failure to export one name does not stop the rest of the batch from
+    being processed: the corresponding result is the
+    :class:`~gssapi.raw.misc.GSSError` instance that would have been raised.
+
+    Args:
+        names (list): the mechanism names (:class:`~gssapi.raw.names.Name`)
+            to export
+
+    Returns:
+        list: the exported name (:class:`bytes`) or
+            :class:`~gssapi.raw.misc.GSSError` for each input name, in the
+            same order
+    """
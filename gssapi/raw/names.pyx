@@ -1,5 +1,7 @@
 GSSAPI="BASE"  # this ensures that a full module is generated by Cython
 
+from libc.stdlib cimport calloc, free
+
 from gssapi.raw.cython_types cimport *
 from gssapi.raw.oids cimport OID
 
@@ -40,6 +42,15 @@ cdef extern from "python_gssapi.h":
                                gss_name_t *name) nogil
 
 
+# per-name state for the batched canonicalize/export functions
+cdef struct _name_state:
+    gss_name_t input_name
+    gss_name_t output_name
+    gss_buffer_desc output_buffer
+    OM_uint32 maj_stat
+    OM_uint32 min_stat
+
+
 cdef class Name:
     # defined in pxd
     # cdef gss_name_t raw_name
@@ -202,3 +213,102 @@ def release_name(Name name not None):
     if maj_stat != GSS_S_COMPLETE:
         raise GSSError(maj_stat, min_stat)
     name.raw_name = NULL
+
+
+cdef _name_state *_alloc_name_states(names) except NULL:
+    cdef size_t count = len(names)
+    cdef _name_state *states = <_name_state *>calloc(
+        count or 1, sizeof(_name_state))
+    if states is NULL:
+        raise MemoryError()
+
+    cdef Name name
+    cdef size_t i
+    try:
+        for i in range(count):
+            name = names[i]
+            if name is None:
+                raise TypeError("Cannot process None as a name")
+            states[i].input_name = name.raw_name
+    except:
+        _free_name_states(states, count)
+        raise
+
+    return states
+
+
+cdef void _free_name_states(_name_state *states, size_t count):
+    cdef OM_uint32 tmp_min_stat
+    cdef size_t i
+    for i in range(count):
+        if states[i].output_name is not GSS_C_NO_NAME:
+            gss_release_name(&tmp_min_stat, &states[i].output_name)
+        if states[i].output_buffer.value is not NULL:
+            gss_release_buffer(&tmp_min_stat, &states[i].output_buffer)
+
+    free(states)
+
+
+def canonicalize_names(names, OID mech not None):
+    # NB: the input names are kept alive by the list while the GIL is
+    # released, since the states only borrow their handles
+    names = list(names)
+    cdef size_t count = len(names)
+    cdef _name_state *states = _alloc_name_states(names)
+
+    cdef Name cn
+    cdef size_t i
+    try:
+        with nogil:
+            for i in range(count):
+                states[i].maj_stat = gss_canonicalize_name(
+                    &states[i].min_stat, states[i].input_name,
+                    &mech.raw_oid, &states[i].output_name)
+
+        res = []
+        for i in range(count):
+            if states[i].maj_stat == GSS_S_COMPLETE:
+                cn = Name()
+                cn.raw_name = states[i].output_name
+                states[i].output_name = GSS_C_NO_NAME
+                res.append(cn)
+            else:
+                err = GSSError(states[i].maj_stat, states[i].min_stat)
+                # the minor status message may depend on thread-local
+                # state, and the results may be used in another thread
+                err._generate_message()
+                res.append(err)
+
+        return res
+    finally:
+        _free_name_states(states, count)
+
+
+def export_names(names):
+    names = list(names)
+    cdef size_t count = len(names)
+    cdef _name_state *states = _alloc_name_states(names)
+
+    cdef size_t i
+    try:
+        with nogil:
+            for i in range(count):
+                states[i].maj_stat = gss_export_name(
+                    &states[i].min_stat, states[i].input_name,
+                    &states[i].output_buffer)
+
+        res = []
+        for i in range(count):
+            if states[i].maj_stat == GSS_S_COMPLETE:
+                res.append((<char*>states[i].output_buffer.value)[
+                    :states[i].output_buffer.length])
+            else:
+                err = GSSError(states[i].maj_stat, states[i].min_stat)
+                # the minor status message may depend on thread-local
+                # state, and the results may be used in another thread
+                err._generate_message()
+                res.append(err)
+
+        return res
+    finally:
+        _free_name_states(states, count)
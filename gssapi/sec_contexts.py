@@ -1,3 +1,9 @@
+import asyncio
+import collections
+import concurrent.futures
+import os
+import threading
+import time
 import typing as t
 
 from gssapi.raw import chan_bindings as rchan_bindings
@@ -11,7 +17,38 @@ from gssapi.raw.types import RequirementFlag, IntEnumFlagSet
 import gssapi.exceptions as excs
 from gssapi import _utils
 from gssapi.names import Name
-from gssapi.creds import Credentials
+from gssapi.creds import Credentials, invalidate_acquire_cache
+
+# the number of entries kept in each of the wrap size caches
+_WRAP_SIZE_CACHE_SIZE = 64
+
+# the wrapped message size used to measure the per-message wrap overhead
+_WRAP_OVERHEAD_REFERENCE_SIZE = 65536
+
+
+_WrapSizeCache = t.OrderedDict[t.Tuple[int, bool], int]
+
+
+def _cache_get(
+    cache: _WrapSizeCache,
+    key: t.Tuple[int, bool],
+) -> t.Optional[int]:
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(
+    cache: _WrapSizeCache,
+    key: t.Tuple[int, bool],
+    value: int,
+) -> None:
+    # evict the least recently used sizes
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _WRAP_SIZE_CACHE_SIZE:
+        cache.popitem(last=False)
 
 
 class SecurityContext(rsec_contexts.SecurityContext,
@@ -89,6 +126,18 @@ class SecurityContext(rsec_contexts.SecurityContext,
         # NB(directxman12): _last_err must be set first
         self._last_err = None
 
+        # This is to work around an MIT krb5 bug (see the `complete` property)
+        self._complete: t.Optional[bool] = None
+
+        # the results of inquiring about the context once it's complete,
+        # since they don't change
+        self._snapshot: t.Optional[tuples.InquireContextResult] = None
+
+        # when the context expires (see `expires_at`), as recorded when it
+        # was established or last refreshed
+        self._expires_at: t.Optional[float] = None
+        self._expiry_known = False
+
         # determine the usage ('initiate' vs 'accept')
         if base is None and token is None:
             # this will be a new context
@@ -146,8 +195,10 @@ class SecurityContext(rsec_contexts.SecurityContext,
                        "context")
                 raise excs.UnknownUsageError(msg, obj="security context")
 
-        # This is to work around an MIT krb5 bug (see the `complete` property)
-        self._complete: t.Optional[bool] = None
+        # (size, encrypted) -> size, see `get_wrap_size_limit` and
+        # `get_wrapped_size`
+        self._wrap_size_cache: _WrapSizeCache = collections.OrderedDict()
+        self._wrapped_size_cache: _WrapSizeCache = collections.OrderedDict()
 
     # NB(directxman12): DO NOT ADD AN __del__ TO THIS CLASS -- it screws up
     #                   the garbage collector if _last_tb is still defined
@@ -156,7 +207,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
 
     def get_signature(
         self,
-        message: bytes,
+        message: _utils._BytesLike,
     ) -> bytes:
         """Calculate the signature for a message.
 
@@ -167,7 +218,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
         message signature and message in your own format.
 
         Args:
-            message (bytes): the input message
+            message (bytes-like): the input message
 
         Returns:
             bytes: the message signature
@@ -183,8 +234,8 @@ class SecurityContext(rsec_contexts.SecurityContext,
 
     def verify_signature(
         self,
-        message: bytes,
-        mic: bytes,
+        message: _utils._BytesLike,
+        mic: _utils._BytesLike,
     ) -> int:
         """Verify the signature for a message.
 
@@ -195,8 +246,8 @@ class SecurityContext(rsec_contexts.SecurityContext,
         Otherwise, it will raise an error.
 
         Args:
-            message (bytes): the message
-            mic (bytes): the signature to verify
+            message (bytes-like): the message
+            mic (bytes-like): the signature to verify
 
         Returns:
             int: the QoP used.
@@ -216,7 +267,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
 
     def wrap(
         self,
-        message: bytes,
+        message: _utils._BytesLike,
         encrypt: bool,
     ) -> tuples.WrapResult:
         """Wrap a message, optionally with encryption
@@ -225,7 +276,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
         encrypting it.
 
         Args:
-            message (bytes): the message to wrap
+            message (bytes-like): the message to wrap
             encrypt (bool): whether or not to encrypt the message
 
         Returns:
@@ -242,7 +293,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
 
     def unwrap(
         self,
-        message: bytes,
+        message: _utils._BytesLike,
     ) -> tuples.UnwrapResult:
         """Unwrap a wrapped message.
 
@@ -250,7 +301,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
         verifying the signature along the way.
 
         Args:
-            message (bytes): the message to unwrap/decrypt
+            message (bytes-like): the message to unwrap/decrypt
 
         Returns:
             UnwrapResult: the unwrapped message and details about it
@@ -269,9 +320,60 @@ class SecurityContext(rsec_contexts.SecurityContext,
 
         return rmessage.unwrap(self, message)
 
+    def wrap_many(
+        self,
+        messages: t.Iterable[_utils._BytesLike],
+        encrypt: bool,
+    ) -> t.List[t.Union[tuples.WrapResult, excs.GSSError]]:
+        """Wrap a series of messages, optionally with encryption
+
+        This wraps each of the given messages in order, like :meth:`wrap`,
+        but processes the whole batch with a single call into the GSSAPI
+        library, which is considerably cheaper for many small messages.
+
+        Errors are returned in place of the corresponding result instead of
+        being raised, so that one bad message does not discard the rest
+        of the batch.
+
+        Args:
+            messages (list): the messages to wrap
+            encrypt (bool): whether or not to encrypt the messages
+
+        Returns:
+            list: a :class:`WrapResult` or :class:`~gssapi.exceptions.GSSError`
+            for each message, in the same order
+        """
+
+        return rmessage.wrap_many(self, messages, encrypt)
+
+    def unwrap_many(
+        self,
+        messages: t.Iterable[_utils._BytesLike],
+    ) -> t.List[t.Union[tuples.UnwrapResult, excs.GSSError]]:
+        """Unwrap a series of wrapped messages.
+
+        This unwraps each of the given messages in order, like
+        :meth:`unwrap`, but processes the whole batch with a single call
+        into the GSSAPI library.
+
+        Errors are returned in place of the corresponding result instead of
+        being raised, so that one bad message does not discard the rest
+        of the batch.
+
+        Args:
+            messages (list): the messages to unwrap/decrypt
+
+        Returns:
+            list: an :class:`UnwrapResult` or
+            :class:`~gssapi.exceptions.GSSError` for each message, in the
+            same order
+        """
+
+        return rmessage.unwrap_many(self, messages)
+
     def encrypt(
         self,
-        message: bytes,
+        message: _utils._BytesLike,
     ) -> bytes:
         """Encrypt a message.
 
@@ -282,7 +384,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
         the encrypted message directly.
 
         Args:
-            message (bytes): the message to encrypt
+            message (bytes-like): the message to encrypt
 
         Returns:
             bytes: the encrypted message
@@ -304,7 +406,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
 
     def decrypt(
         self,
-        message: bytes,
+        message: _utils._BytesLike,
     ) -> bytes:
         """Decrypt a message.
 
@@ -315,7 +417,7 @@ class SecurityContext(rsec_contexts.SecurityContext,
         message directly.
 
         Args:
-            message (bytes): the encrypted message
+            message (bytes-like): the encrypted message
 
         Returns:
             bytes: the decrypted message
@@ -344,6 +446,92 @@ class SecurityContext(rsec_contexts.SecurityContext,
 
         return res.message
 
+    def encrypt_stream(
+        self,
+        data: _utils._ByteSource,
+        max_token_size: int = 65536,
+    ) -> t.Iterator[bytes]:
+        """Encrypt a stream of data in bounded-size pieces.
+
+        This method splits the input into pieces small enough that each
+        encrypted piece fits into `max_token_size` bytes (as per
+        :meth:`get_wrap_size_limit`), encrypts each piece as per
+        :meth:`encrypt`, and yields the results one at a time, each prefixed
+        with its length as a 4-byte big-endian integer.  The output can be
+        passed to :meth:`decrypt_stream` on the other end.
+
+        The input may be any bytes-like object (including a memory-mapped
+        file, which is sliced without being copied), a binary file-like
+        object (which is read one piece at a time), or an iterable of
+        bytes-like chunks.  Only a single piece is held in memory at a time.
+
+        Args:
+            data: the data to encrypt
+            max_token_size (int): the maximum size of each encrypted piece,
+                not including its length prefix
+
+        Yields:
+            bytes: the length-prefixed encrypted pieces
+
+        Raises:
+            ~gssapi.exceptions.EncryptionNotUsed: the encryption could not be
+                used
+            ~gssapi.exceptions.ExpiredContextError
+            ~gssapi.exceptions.MissingContextError
+            ~gssapi.exceptions.BadQoPError
+        """
+
+        chunk_size = self.get_wrap_size_limit(max_token_size)
+        if chunk_size <= 0:
+            raise ValueError(f"A maximum token size of {max_token_size} "
+                             "bytes leaves no room for any data")
+
+        for chunk in _utils._iter_chunks(data, chunk_size):
+            token = self.encrypt(chunk)
+            yield _utils._FRAME_HEADER.pack(len(token)) + token
+
+    def decrypt_stream(
+        self,
+        data: _utils._ByteSource,
+        max_token_size: int = 65536,
+    ) -> t.Iterator[bytes]:
+        """Decrypt a stream of data produced by :meth:`encrypt_stream`.
+
+        This method splits the input back into the length-prefixed encrypted
+        pieces produced by :meth:`encrypt_stream`, decrypts each one as per
+        :meth:`decrypt`, and yields the decrypted pieces in order.
+
+        The input may be of any of the types accepted by
+        :meth:`encrypt_stream`.  Pieces larger than `max_token_size` are
+        rejected, so only a bounded amount of data is held in memory at
+        a time.
+
+        Args:
+            data: the length-prefixed encrypted data
+            max_token_size (int): the maximum size of each encrypted piece,
+                not including its length prefix
+
+        Yields:
+            bytes: the decrypted pieces
+
+        Raises:
+            ValueError: the input was truncated or contained a piece larger
+                than `max_token_size`
+            ~gssapi.exceptions.EncryptionNotUsed: encryption was expected, but
+                not used
+            ~gssapi.exceptions.InvalidTokenError
+            ~gssapi.exceptions.BadMICError
+            ~gssapi.exceptions.DuplicateTokenError
+            ~gssapi.exceptions.ExpiredTokenError
+            ~gssapi.exceptions.TokenTooLateError
+            ~gssapi.exceptions.TokenTooEarlyError
+            ~gssapi.exceptions.ExpiredContextError
+            ~gssapi.exceptions.MissingContextError
+        """
+
+        for token in _utils._iter_frames(data, max_token_size):
+            yield self.decrypt(token)
+
     def get_wrap_size_limit(
         self,
         desired_output_size: int,
@@ -368,8 +556,65 @@ class SecurityContext(rsec_contexts.SecurityContext,
             ~gssapi.exceptions.BadQoPError
         """
 
-        return rmessage.wrap_size_limit(self, desired_output_size,
-                                        encrypted)
+        key = (desired_output_size, encrypted)
+        limit = _cache_get(self._wrap_size_cache, key)
+        if limit is None:
+            limit = rmessage.wrap_size_limit(self, desired_output_size,
+                                             encrypted)
+            _cache_put(self._wrap_size_cache, key, limit)
+
+        return limit
+
+    def get_wrapped_size(
+        self,
+        input_size: int,
+        encrypted: bool = True,
+    ) -> int:
+        """Calculate the wrapped message size for a given message size.
+
+        This method is the inverse of :meth:`get_wrap_size_limit`: it
+        calculates a wrapped/encrypted message size which is large enough
+        to hold a wrapped/encrypted message with the given input size.
+
+        Like :meth:`get_wrap_size_limit`, the results are cached until the
+        security context changes state, so this is cheap to call
+        for every message.
+
+        Args:
+            input_size (int): the input message size
+            encrypted (bool): whether or not encryption should be taken
+                into account
+
+        Returns:
+            int: the output message size
+
+        Raises:
+            ~gssapi.exceptions.MissingContextError
+            ~gssapi.exceptions.ExpiredContextError
+            ~gssapi.exceptions.BadQoPError
+        """
+
+        key = (input_size, encrypted)
+        size = _cache_get(self._wrapped_size_cache, key)
+        if size is None:
+            # the overhead observed for a large reference size is cached,
+            # so usually this doesn't need to call into GSSAPI at all
+            overhead = (_WRAP_OVERHEAD_REFERENCE_SIZE -
+                        self.get_wrap_size_limit(
+                            _WRAP_OVERHEAD_REFERENCE_SIZE, encrypted))
+            size = input_size + overhead
+
+            # mechanisms which pad to a block size may need a little more
+            # for some sizes -- check directly, so that the probed sizes
+            # don't crowd out the useful entries in the limit cache
+            limit = rmessage.wrap_size_limit(self, size, encrypted)
+            while limit < input_size:
+                size += input_size - limit
+                limit = rmessage.wrap_size_limit(self, size, encrypted)
+
+            _cache_put(self._wrapped_size_cache, key, size)
+
+        return size
 
     def process_token(
         self,
@@ -471,11 +716,84 @@ class SecurityContext(rsec_contexts.SecurityContext,
                                            res.flags, res.locally_init,
                                            res.complete)
 
+    def _take_snapshot(self) -> tuples.InquireContextResult:
+        snapshot = self._inquire()
+        self._snapshot = snapshot
+        self._set_expiry(snapshot.lifetime)
+
+        return snapshot
+
+    def _set_expiry(
+        self,
+        lifetime: t.Optional[int],
+    ) -> None:
+        if lifetime is None:
+            self._expires_at = None
+        else:
+            self._expires_at = time.monotonic() + lifetime
+
+        self._expiry_known = True
+
     @property
     def lifetime(self) -> int:
         """The amount of time for which this context remains valid"""
+        # once we know when the context expires, just count down
+        expires_at = self._expires_at
+        if expires_at is not None:
+            remaining = int(expires_at - time.monotonic())
+            if remaining > 0:
+                return remaining
+
         return rsec_contexts.context_time(self)
 
+    @property
+    def expires_at(self) -> t.Optional[float]:
+        """When this context expires, as a :func:`time.monotonic` timestamp
+
+        This is recorded when the context is established, so reading it
+        doesn't involve any calls into GSSAPI.  If it isn't known yet (for
+        instance, for an imported context), it is fetched as per
+        :meth:`refresh_expiry`.  It is None if the context never expires.
+        """
+        if not self._expiry_known:
+            return self.refresh_expiry()
+
+        return self._expires_at
+
+    def is_expiring(
+        self,
+        within: float = 0,
+    ) -> bool:
+        """Check whether this context expires within a given time
+
+        This uses :attr:`expires_at`, and so doesn't usually involve any
+        calls into GSSAPI.
+
+        Args:
+            within (float): the number of seconds from now to check
+
+        Returns:
+            bool: whether the context will have expired `within` seconds
+            from now
+        """
+
+        expires_at = self.expires_at
+        return (expires_at is not None and
+                expires_at - time.monotonic() <= within)
+
+    def refresh_expiry(self) -> t.Optional[float]:
+        """Fetch when this context expires from GSSAPI
+
+        Returns:
+            float: the new value of :attr:`expires_at`
+
+        Raises:
+            ~gssapi.exceptions.MissingContextError
+        """
+
+        self._set_expiry(self._inquire(lifetime=True).lifetime)
+        return self._expires_at
+
     @property
     def delegated_creds(self) -> t.Optional[Credentials]:
         """The credentials delegated from the initiator to the acceptor
@@ -516,10 +834,76 @@ class SecurityContext(rsec_contexts.SecurityContext,
                 else:
                     self._complete = complete
 
-            return complete
+            return bool(complete)
         else:
             return False
 
+    @property
+    def step_may_block(self) -> bool:
+        """Whether the next negotiation step may block on the network
+
+        The first step of an initiating context may need to contact the
+        KDC, for instance to obtain a service ticket which is not yet cached
+        or a forwardable ticket to delegate, and so may block for an
+        arbitrary amount of time.  All other steps only process tokens
+        locally.
+
+        Since GSSAPI offers no portable way of checking what is cached,
+        this is always True for the first step of an initiating context.
+        """
+        return self.usage == 'initiate' and not self._started
+
+    async def astep(
+        self,
+        token: t.Optional[bytes] = None,
+        executor: t.Optional[concurrent.futures.Executor] = None,
+    ) -> t.Optional[bytes]:
+        """Perform a negotiation step without blocking the event loop.
+
+        This method works like :meth:`step`, but runs the step in an
+        executor if it may block on the network (see
+        :attr:`step_may_block`).  Otherwise, the step is run directly in
+        the event loop, avoiding the cost of handing it to another thread.
+
+        Args:
+            token (bytes): the input token from the other participant's step
+            executor (concurrent.futures.Executor): the executor to run
+                blocking steps in, or None to use the event loop's default
+                executor
+
+        Returns:
+            bytes: the output token to send to the other participant
+
+        Raises:
+            the same exceptions as :meth:`step`
+        """
+
+        if self.step_may_block:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, self._threaded_step,
+                                              token)
+
+        return self.step(token)
+
+    def _threaded_step(
+        self,
+        token: t.Optional[bytes],
+    ) -> t.Optional[bytes]:
+        # the minor status messages may depend on thread-local state (e.g.
+        # with MIT krb5), so generate them before the errors leave this
+        # thread
+        try:
+            out_token = self.step(token)
+        except excs.GSSError as e:
+            e._generate_message()
+            raise
+
+        last_err = getattr(self, '_last_err', None)
+        if last_err is not None:
+            last_err._generate_message()
+
+        return out_token
+
     @_utils.catch_and_return_token
     def step(
         self,
@@ -596,6 +980,14 @@ class SecurityContext(rsec_contexts.SecurityContext,
             self._delegated_creds = None
 
         self._complete = not res.more_steps
+        self._snapshot = None
+        if self._complete:
+            self._set_expiry(res.lifetime)
+        else:
+            self._expires_at = None
+            self._expiry_known = False
+        self._wrap_size_cache.clear()
+        self._wrapped_size_cache.clear()
 
         return res.token
 
@@ -611,6 +1003,14 @@ class SecurityContext(rsec_contexts.SecurityContext,
                                              token)
 
         self._complete = not res.more_steps
+        self._snapshot = None
+        if self._complete:
+            self._set_expiry(res.lifetime)
+        else:
+            self._expires_at = None
+            self._expiry_known = False
+        self._wrap_size_cache.clear()
+        self._wrapped_size_cache.clear()
 
         return res.token
 
@@ -620,3 +1020,170 @@ class SecurityContext(rsec_contexts.SecurityContext,
     ) -> t.Tuple[t.Type["SecurityContext"], t.Tuple[None, bytes]]:
         # the unpickle arguments to new are (base=None, token=self.export())
         return (type(self), (None, self.export()))
+
+
+class AcceptorPool:
+    """A factory for accepting security contexts with shared credentials
+
+    Accepting a security context without credentials makes the GSSAPI
+    implementation resolve the default acceptor credentials for every
+    context.  This class instead acquires a set of acceptor credentials
+    once, and uses them for every context it creates.
+
+    If the credentials come from a file keytab (either the one passed in,
+    the one in the credential store, or the one named by the
+    ``KRB5_KTNAME`` environment variable), the keytab's modification time is
+    checked at most once every `check_interval` seconds, and the
+    credentials are acquired again when it changes, so that new keys are
+    picked up without restarting.
+
+    This class is thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: t.Optional[rnames.Name] = None,
+        mechs: t.Optional[t.Iterable[roids.OID]] = None,
+        keytab: t.Optional[str] = None,
+        store: t.Optional[
+            t.Dict[t.Union[bytes, str], t.Union[bytes, str]]
+        ] = None,
+        check_interval: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            name (~gssapi.names.Name): the name to accept contexts for, or
+                None to accept contexts for any name in the keytab
+            mechs (list): the mechanisms to accept contexts for, or None
+                for the default mechanisms
+            keytab (str): the keytab to acquire the credentials from
+                (:requires-ext:`cred_store`), or None for the default keytab.
+                The default keytab is only watched for changes when it is
+                named by the ``KRB5_KTNAME`` environment variable, since the
+                system default (e.g. from ``krb5.conf``) can't be looked up
+                portably, so pass the keytab explicitly to have it watched.
+            store (dict): the credential store to acquire the credentials
+                from, as per :meth:`Credentials.acquire
+                <gssapi.creds.Credentials.acquire>`
+            check_interval (float): the minimum number of seconds between
+                checks of the keytab's modification time
+
+        Raises:
+            ~gssapi.exceptions.BadMechanismError
+            ~gssapi.exceptions.BadNameTypeError
+            ~gssapi.exceptions.BadNameError
+            ~gssapi.exceptions.ExpiredCredentialsError
+            ~gssapi.exceptions.MissingCredentialsError
+        """
+
+        if keytab is not None:
+            store = dict(store or {})
+            store['keytab'] = keytab
+
+        self.name = name
+        self.mechs = list(mechs) if mechs is not None else None
+        self.store = store
+        self.check_interval = check_interval
+
+        self._keytab_path = self._find_keytab_path()
+        self._lock = threading.Lock()
+        self._creds: t.Optional[Credentials] = None
+        self._keytab_mtime: t.Optional[int] = None
+        self._next_check = 0.0
+
+        self.refresh()
+
+    @property
+    def credentials(self) -> Credentials:
+        """The acceptor credentials, acquired again if the keytab changed"""
+        creds = self._creds
+        if creds is None or (self._keytab_path is not None and
+                             time.monotonic() >= self._next_check):
+            with self._lock:
+                creds = self._check_keytab()
+
+        return creds
+
+    def refresh(self) -> Credentials:
+        """Acquire the acceptor credentials again
+
+        Returns:
+            Credentials: the newly acquired credentials
+        """
+
+        with self._lock:
+            return self._acquire(self._stat_keytab())
+
+    def new_context(
+        self,
+        channel_bindings: t.Optional[rchan_bindings.ChannelBindings] = None,
+    ) -> SecurityContext:
+        """Create a new accepting security context
+
+        Args:
+            channel_bindings (ChannelBindings): the channel bindings to use
+                with the context, if any
+
+        Returns:
+            SecurityContext: a new accepting security context using the
+            shared acceptor credentials
+        """
+
+        return SecurityContext(creds=self.credentials, usage='accept',
+                               channel_bindings=channel_bindings)
+
+    def _find_keytab_path(self) -> t.Optional[str]:
+        keytab: t.Optional[t.Union[bytes, str]] = None
+        if self.store is not None:
+            keytab = self.store.get('keytab', self.store.get(b'keytab'))
+        if keytab is None:
+            keytab = os.environ.get('KRB5_KTNAME')
+        if keytab is None:
+            return None
+
+        if isinstance(keytab, bytes):
+            keytab = keytab.decode(_utils._get_encoding())
+
+        # only file keytabs have a modification time to watch
+        kt_type, sep, residual = keytab.partition(':')
+        if not sep:
+            return keytab
+        elif kt_type in ('FILE', 'WRFILE'):
+            return residual
+        else:
+            return None
+
+    def _stat_keytab(self) -> t.Optional[int]:
+        if self._keytab_path is None:
+            return None
+
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            return os.stat(self._keytab_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_keytab(self) -> Credentials:
+        # called with the lock held
+        creds = self._creds
+        if creds is not None and time.monotonic() < self._next_check:
+            return creds
+
+        mtime = self._stat_keytab()
+        if creds is not None and mtime == self._keytab_mtime:
+            return creds
+
+        return self._acquire(mtime)
+
+    def _acquire(
+        self,
+        mtime: t.Optional[int],
+    ) -> Credentials:
+        # called with the lock held
+        invalidate_acquire_cache(self.name, 'accept')
+        creds = Credentials(name=self.name, mechs=self.mechs,
+                            usage='accept', store=self.store)
+
+        self._creds = creds
+        self._keytab_mtime = mtime
+        return creds
@@ -1,14 +1,26 @@
+import asyncio
+import base64
 import copy
+import inspect
+import io
 import os
 import socket
 import sys
 import pickle
+import threading
+import time
+import unittest
+from unittest import mock
 
 from parameterized import parameterized
 
+from gssapi import aio as gssaio
 from gssapi import creds as gsscreds
+from gssapi import http as gsshttp
 from gssapi import mechs as gssmechs
 from gssapi import names as gssnames
+from gssapi import parallel as gssparallel
+from gssapi import pool as gsspool
 from gssapi import sec_contexts as gssctx
 from gssapi import raw as gb
 from gssapi import _utils as gssutils
@@ -16,6 +28,11 @@ from gssapi import exceptions as excs
 import k5test.unit as ktu
 import k5test as kt
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 
 TARGET_SERVICE_NAME = b'host'
 FQDN = (
@@ -313,6 +330,114 @@ class CredsTestCase(_GSSAPIKerberosTestCase):
                                           store=store)
         self.assertIsInstance(retrieved_creds, gsscreds.Credentials)
 
+    def test_expiry(self):
+        creds = gsscreds.Credentials(name=self.name, lifetime=30,
+                                     usage='initiate')
+
+        with mock.patch.object(gsscreds.rcreds, 'inquire_cred',
+                               wraps=gb.inquire_cred) as inquire_cred:
+            self.assertIsInstance(creds.expires_at, float)
+            self.assertFalse(creds.is_expiring())
+            self.assertTrue(creds.is_expiring(within=10 ** 9))
+            inquire_cred.assert_not_called()
+
+            self.assertIsInstance(creds.refresh_expiry(), float)
+            inquire_cred.assert_called_once()
+
+        # credentials created from others have to ask
+        other_creds = gsscreds.Credentials(base=gb.acquire_cred(
+            self.name, usage='initiate').creds)
+        self.assertIsInstance(other_creds.expires_at, float)
+
+    def test_info(self):
+        creds = gsscreds.Credentials(name=self.name, usage='initiate')
+
+        with mock.patch.object(gsscreds.rcreds, 'inquire_cred',
+                               wraps=gb.inquire_cred) as inquire_cred:
+            self.assertEqual(creds.name, self.name)
+            self.assertEqual(creds.usage, 'initiate')
+            self.assertIn(gb.MechType.kerberos, creds.mechs)
+            self.assertIs(creds.info.name, creds.name)
+            inquire_cred.assert_called_once()
+
+            if sys.platform != 'darwin':
+                self.assertIsInstance(creds.lifetime, int)
+                self.assertEqual(inquire_cred.call_count, 2)
+
+            info = creds.refresh_info()
+            self.assertIs(creds.info, info)
+
+    def test_credential_manager(self):
+        with gsscreds.CredentialManager(renew_fraction=0.5,
+                                        background=False) as manager:
+            creds = manager.get(self.name)
+            self.assertIsInstance(creds, gsscreds.Credentials)
+            self.assertIs(manager.get(self.name), creds)
+            self.assertIsNot(manager.get(self.name, usage='both'), creds)
+
+            # nothing is due for renewal yet
+            manager.renew()
+            self.assertIs(manager.get(self.name), creds)
+
+            with mock.patch('time.monotonic',
+                            return_value=creds.expires_at - 1):
+                manager.renew()
+            renewed_creds = manager.get(self.name)
+            self.assertIsNot(renewed_creds, creds)
+            self.assertEqual(renewed_creds.name, creds.name)
+
+        self.assertRaises(ValueError, manager.get, self.name)
+
+    def test_acquire_cache(self):
+        gsscreds.enable_acquire_cache(max_size=2)
+        self.addCleanup(gsscreds.disable_acquire_cache)
+
+        with mock.patch.object(gsscreds.rcreds, 'acquire_cred',
+                               wraps=gb.acquire_cred) as acquire_cred:
+            creds = gsscreds.Credentials(name=self.name, usage='initiate')
+            res = gsscreds.Credentials.acquire(name=self.name,
+                                               usage='initiate')
+            self.assertIs(res.creds, creds)
+            self.assertIn(gb.MechType.kerberos, res.mechs)
+            self.assertEqual(acquire_cred.call_count, 1)
+
+            # the name is left usable
+            self.assertEqual(creds.name, self.name)
+
+            # different arguments are cached separately, up to max_size
+            both_creds = gsscreds.Credentials(name=self.name, usage='both')
+            self.assertIsNot(both_creds, creds)
+            gsscreds.Credentials(usage='initiate')
+            self.assertEqual(acquire_cred.call_count, 3)
+            self.assertIsNot(
+                gsscreds.Credentials(name=self.name, usage='initiate'), creds)
+            self.assertEqual(acquire_cred.call_count, 4)
+
+            gsscreds.invalidate_acquire_cache(self.name)
+            gsscreds.Credentials(name=self.name, usage='initiate')
+            self.assertEqual(acquire_cred.call_count, 5)
+
+    def test_acquire_cache_default_ccache(self):
+        gsscreds.enable_acquire_cache()
+        self.addCleanup(gsscreds.disable_acquire_cache)
+
+        creds = gsscreds.Credentials(usage='initiate')
+
+        other_ccache = 'FILE:{tmpdir}/other_default_ccache'.format(
+            tmpdir=self.realm.tmpdir)
+        self.realm.kinit(self.realm.host_princ,
+                         flags=['-k', '-c', other_ccache])
+
+        # switching the default ccache switches the default credentials
+        with mock.patch.dict(os.environ, {'KRB5CCNAME': other_ccache}):
+            other_creds = gsscreds.Credentials(usage='initiate')
+            self.assertIsNot(other_creds, creds)
+            self.assertNotEqual(other_creds.name, creds.name)
+            self.assertIs(gsscreds.Credentials(usage='initiate'),
+                          other_creds)
+
+        self.assertIs(gsscreds.Credentials(usage='initiate'), creds)
+
     @ktu.gssapi_extension_test('cred_imp_exp', 'credentials import-export')
     def test_export(self):
         creds = gsscreds.Credentials(name=self.name,
@@ -484,6 +609,91 @@ class NamesTestCase(_GSSAPIKerberosTestCase):
 
         self.assertEqual(name2.name_type, gb.NameType.kerberos_principal)
 
+    def test_display_is_memoized(self):
+        name = gssnames.Name(SERVICE_PRINCIPAL, gb.NameType.kerberos_principal)
+
+        with mock.patch.object(gssnames.rname, 'display_name',
+                               wraps=gb.display_name) as display_name:
+            name_bytes = bytes(name)
+            self.assertEqual(str(name), name_bytes.decode('UTF-8'))
+            self.assertEqual(name.name_type, gb.NameType.kerberos_principal)
+            self.assertIn(repr(name_bytes), repr(name))
+            display_name.assert_called_once()
+
+    def test_hash(self):
+        name = gssnames.Name(TARGET_SERVICE_NAME,
+                             gb.NameType.hostbased_service)
+        canon_name = name.canonicalize(gb.MechType.kerberos)
+        other_name = gssnames.Name(self.ADMIN_PRINC,
+                                   gb.NameType.kerberos_principal)
+
+        self.assertEqual(hash(name), hash(canon_name))
+        self.assertEqual(len({name, canon_name, other_name}), 2)
+        self.assertEqual({name: 1}[canon_name], 1)
+
+    def test_canonicalize_export_names(self):
+        names = [gssnames.Name(TARGET_SERVICE_NAME,
+                               gb.NameType.hostbased_service),
+                 gssnames.Name(self.ADMIN_PRINC,
+                               gb.NameType.kerberos_principal)] * 3
+
+        canon_names = gssnames.canonicalize_names(names, gb.MechType.kerberos)
+        self.assertEqual(canon_names,
+                         [name.canonicalize(gb.MechType.kerberos)
+                          for name in names])
+        self.assertIsInstance(canon_names[0], gssnames.Name)
+        self.assertEqual(
+            gssnames.canonicalize_names_parallel(names, gb.MechType.kerberos,
+                                                 workers=2),
+            canon_names)
+
+        exported = gssnames.export_names(canon_names)
+        self.assertEqual(exported, [name.export() for name in canon_names])
+        self.assertEqual(
+            gssnames.export_names_parallel(canon_names, workers=2), exported)
+
+    def test_authorization_set(self):
+        authz = gssnames.AuthorizationSet([SERVICE_PRINCIPAL, self.USER_PRINC],
+                                          gb.NameType.kerberos_principal)
+        self.assertEqual(len(authz), 2)
+
+        name = gssnames.Name(SERVICE_PRINCIPAL, gb.NameType.kerberos_principal)
+        with mock.patch.object(gssnames.rname, 'compare_name') as compare:
+            self.assertIn(name, authz)
+            self.assertIn(name.canonicalize(gb.MechType.kerberos), authz)
+            self.assertNotIn(self.ADMIN_PRINC, authz)
+            compare.assert_not_called()
+
+        authz.discard(name)
+        self.assertNotIn(SERVICE_PRINCIPAL, authz)
+        self.assertEqual(len(authz), 1)
+
+    def test_name_interning(self):
+        self.assertIsNone(gssnames.name_interning_info())
+        gssnames.enable_name_interning(max_size=1)
+        self.addCleanup(gssnames.disable_name_interning)
+
+        name = gssnames.Name(TARGET_SERVICE_NAME,
+                             gb.NameType.hostbased_service)
+        self.assertIs(gssnames.Name(TARGET_SERVICE_NAME.decode('UTF-8'),
+                                    gb.NameType.hostbased_service), name)
+        self.assertIsNot(gssnames.Name(TARGET_SERVICE_NAME), name)
+        self.assertIsNot(gssnames.Name(TARGET_SERVICE_NAME,
+                                       gb.NameType.hostbased_service), name)
+
+        self.assertEqual(gssnames.name_interning_info(),
+                         gssnames.NameInterningInfo(hits=1, misses=3,
+                                                    max_size=1, size=1))
+
+        # copies aren't shared
+        name_copy = copy.copy(name)
+        self.assertEqual(name_copy, name)
+        self.assertFalse(name_copy._interned)
+
+        if gssnames.rname_rfc6680 is not None:
+            with self.assertRaises(TypeError):
+                name.attributes['urn:greet:greeting'] = b'some val'
+
     @ktu.gssapi_extension_test('rfc6680', 'RFC 6680')
     @ktu.krb_provider_test(['mit'], 'gss_display_name_ext as it is not '
                            'implemented for krb5')
@@ -661,6 +871,34 @@ class NamesTestCase(_GSSAPIKerberosTestCase):
         # greet:greeting's delete).  Instead, just set the value again.
         canon_name.attributes['urn:greet:greeting'] = b'some other val'
 
+    @ktu.gssapi_extension_test('rfc6680', 'RFC 6680')
+    @ktu.krb_plugin_test('authdata', 'greet_client')
+    def test_name_attribute_snapshot(self):
+        name = gssnames.Name(TARGET_SERVICE_NAME,
+                             gb.NameType.hostbased_service)
+        canon_name = name.canonicalize(gb.MechType.kerberos)
+        canon_name.attributes['urn:greet:greeting'] = (b'some val', True)
+
+        with mock.patch.object(gssnames.rname_rfc6680, 'inquire_name',
+                               wraps=gb.inquire_name) as inquire_name:
+            snapshot = canon_name.attributes.snapshot()
+            self.assertIs(canon_name.attributes.snapshot(), snapshot)
+            self.assertEqual(snapshot[b'urn:greet:greeting'].values,
+                             (b'some val',))
+            self.assertTrue(snapshot[b'urn:greet:greeting'].complete)
+            self.assertIn(b'urn:greet:greeting', list(canon_name.attributes))
+            self.assertTrue(canon_name.is_mech_name)
+            inquire_name.assert_called_once()
+
+        with self.assertRaises(TypeError):
+            snapshot[b'urn:greet:greeting'] = b'some other val'
+
+        canon_name.attributes['urn:greet:greeting'] = b'some other val'
+        new_snapshot = canon_name.attributes.snapshot()
+        self.assertIsNot(new_snapshot, snapshot)
+        self.assertEqual(new_snapshot[b'urn:greet:greeting'].values,
+                         (b'some other val',))
+
 
 class SecurityContextTestCase(_GSSAPIKerberosTestCase):
     def setUp(self):
@@ -733,6 +971,81 @@ class SecurityContextTestCase(_GSSAPIKerberosTestCase):
 
         return (client_ctx, server_ctx)
 
+    def test_inquire_snapshot(self):
+        client_ctx, server_ctx = self._create_completed_contexts()
+
+        inquire_context = gb.inquire_context
+        with mock.patch.object(gssctx.rsec_contexts, 'inquire_context',
+                               wraps=inquire_context) as inquire, \
+                mock.patch.object(gssctx.rsec_contexts, 'context_time',
+                                  wraps=gb.context_time) as context_time:
+            initiator_name = server_ctx.initiator_name
+            self.assertEqual(inquire.call_count, 1)
+
+            self.assertIs(server_ctx.initiator_name, initiator_name)
+            self.assertIsInstance(server_ctx.target_name, gssnames.Name)
+            self.assertEqual(server_ctx.mech, gb.MechType.kerberos)
+            self.assertIsInstance(server_ctx.actual_flags, gb.IntEnumFlagSet)
+            self.assertFalse(server_ctx.locally_initiated)
+            self.assertEqual(inquire.call_count, 1)
+
+            self.assertIsInstance(server_ctx.lifetime, int)
+            self.assertGreater(server_ctx.lifetime, 0)
+            context_time.assert_not_called()
+
+    def test_expiry(self):
+        client_ctx, server_ctx = self._create_completed_contexts()
+
+        with mock.patch.object(gssctx.rsec_contexts, 'inquire_context',
+                               wraps=gb.inquire_context) as inquire:
+            for ctx in (client_ctx, server_ctx):
+                self.assertIsInstance(ctx.expires_at, float)
+                self.assertFalse(ctx.is_expiring())
+                self.assertTrue(ctx.is_expiring(within=10 ** 9))
+            inquire.assert_not_called()
+
+            self.assertIsInstance(client_ctx.refresh_expiry(), float)
+            inquire.assert_called_once()
+
+    def test_context_pool(self):
+        def establish(name, mech, flags):
+            self.assertEqual(name, self.target_name)
+            return self._create_completed_contexts()[0]
+
+        establish = mock.Mock(side_effect=establish)
+        with gsspool.ContextPool(establish, max_per_key=1,
+                                 background=False) as pool:
+            ctx = pool.checkout(self.target_name)
+            self.assertTrue(ctx.complete)
+            pool.checkin(ctx)
+
+            with pool.context(self.target_name) as reused_ctx:
+                self.assertIs(reused_ctx, ctx)
+                other_ctx = pool.checkout(self.target_name)
+                self.assertIsNot(other_ctx, ctx)
+            self.assertEqual(establish.call_count, 2)
+
+            # only one context is kept per target
+            pool.checkin(other_ctx)
+            self.assertIs(pool.checkout(self.target_name), ctx)
+            self.assertRaises(ValueError, pool.checkin, other_ctx)
+
+            # targets are forgotten once they have no contexts left
+            self.assertEqual(len(pool._targets), 1)
+            pool.discard(ctx)
+            self.assertEqual(pool._targets, {})
+            ctx = pool.checkout(self.target_name)
+            self.assertEqual(establish.call_count, 3)
+
+            # contexts close to expiring are replaced
+            pool.checkin(ctx)
+            pool.refresh_ahead = 10 ** 9
+            pool.refresh()
+            self.assertEqual(establish.call_count, 4)
+            self.assertIsNot(pool.checkout(self.target_name), ctx)
+
+        self.assertRaises(ValueError, pool.checkout, self.target_name)
+
     def test_complete_on_partially_completed(self):
         client_ctx = self._create_client_ctx()
         client_tok = client_ctx.step()
@@ -873,6 +1186,42 @@ class SecurityContextTestCase(_GSSAPIKerberosTestCase):
         self.assertEqual(unwrap_res.message, b"test message")
         self.assertTrue(unwrap_res.encrypted)
 
+    def test_wrap_many_unwrap_many(self):
+        client_ctx, server_ctx = self._create_completed_contexts()
+
+        wrap_res = client_ctx.wrap_many([b'test message', b'other'], True)
+        self.assertEqual(len(wrap_res), 2)
+        for res in wrap_res:
+            self.assertIsInstance(res, gb.WrapResult)
+            self.assertTrue(res.encrypted)
+
+        unwrap_res = server_ctx.unwrap_many([r.message for r in wrap_res])
+        self.assertEqual([r.message for r in unwrap_res],
+                         [b'test message', b'other'])
+
+    def test_encrypt_decrypt_stream(self):
+        client_ctx, server_ctx = self._create_completed_contexts()
+        data = os.urandom(10000)
+
+        frames = list(client_ctx.encrypt_stream(io.BytesIO(data), 1024))
+        self.assertGreater(len(frames), 1)
+        for frame in frames:
+            self.assertIsInstance(frame, bytes)
+            self.assertLessEqual(len(frame), 1024 + 4)
+
+        stream = io.BytesIO(b''.join(frames))
+        decrypted = b''.join(server_ctx.decrypt_stream(stream, 1024))
+        self.assertEqual(decrypted, data)
+
+    def test_decrypt_stream_rejects_bad_framing(self):
+        client_ctx, server_ctx = self._create_completed_contexts()
+        frames = b''.join(client_ctx.encrypt_stream([b'test message']))
+
+        self.assertRaises(ValueError, list,
+                          server_ctx.decrypt_stream(frames[:-1]))
+        self.assertRaises(ValueError, list,
+                          server_ctx.decrypt_stream(frames, 4))
+
     def test_get_wrap_size_limit(self):
         client_ctx, server_ctx = self._create_completed_contexts()
 
@@ -884,6 +1233,37 @@ class SecurityContextTestCase(_GSSAPIKerberosTestCase):
         self.assertLessEqual(with_conf, 100)
         self.assertLessEqual(without_conf, 100)
 
+    def test_get_wrapped_size(self):
+        client_ctx, server_ctx = self._create_completed_contexts()
+
+        for encrypted in (True, False):
+            wrapped_size = client_ctx.get_wrapped_size(100, encrypted)
+
+            self.assertIsInstance(wrapped_size, int)
+            self.assertGreaterEqual(wrapped_size, 100)
+            self.assertGreaterEqual(
+                client_ctx.get_wrap_size_limit(wrapped_size, encrypted), 100)
+
+            wrapped = client_ctx.wrap(b'a' * 100, encrypted).message
+            self.assertLessEqual(len(wrapped), wrapped_size)
+
+        self.assertIn((100, True), client_ctx._wrapped_size_cache)
+
+        # only the reference size (and the sizes we asked about) are cached
+        reference = gssctx._WRAP_OVERHEAD_REFERENCE_SIZE
+        self.assertIn((reference, True), client_ctx._wrap_size_cache)
+        self.assertIn((reference, False), client_ctx._wrap_size_cache)
+        self.assertLessEqual(len(client_ctx._wrap_size_cache), 4)
+
+        # the caches evict the least recently used sizes
+        for size in range(gssctx._WRAP_SIZE_CACHE_SIZE + 1):
+            client_ctx.get_wrap_size_limit(1000 + size)
+            client_ctx.get_wrap_size_limit(reference)
+        self.assertEqual(len(client_ctx._wrap_size_cache),
+                         gssctx._WRAP_SIZE_CACHE_SIZE)
+        self.assertIn((reference, True), client_ctx._wrap_size_cache)
+        self.assertNotIn((1000, True), client_ctx._wrap_size_cache)
+
     def test_get_signature(self):
         client_ctx, server_ctx = self._create_completed_contexts()
         mic_token = client_ctx.get_signature(b'some message')
@@ -935,3 +1315,393 @@ class SecurityContextTestCase(_GSSAPIKerberosTestCase):
 
         self.assertRaises(gb.BadChannelBindingsError,
                           lambda: server_ctx.complete)
+
+    @ktu.krb_minversion_test("1.11", "returning tokens", provider="mit")
+    @ktu.krb_provider_test(["mit"], "returning tokens")
+    def test_defer_step_error_on_async_method(self):
+        gssctx.SecurityContext.__DEFER_STEP_ERRORS__ = True
+        bdgs = gb.ChannelBindings(application_data=b'abcxyz')
+        client_ctx = self._create_client_ctx(lifetime=400,
+                                             channel_bindings=bdgs)
+
+        client_token = client_ctx.step()
+        self.assertIsInstance(client_token, bytes)
+
+        bdgs.application_data = b'defuvw'
+        server_ctx = gssctx.SecurityContext(creds=self.server_creds,
+                                            channel_bindings=bdgs)
+        self.assertIsInstance(server_ctx.step(client_token), bytes)
+
+        # the wrapper keeps async methods as coroutine functions, and
+        # raises the deferred error when the coroutine is run
+        self.assertTrue(inspect.iscoroutinefunction(server_ctx.astep))
+        self.assertRaises(gb.BadChannelBindingsError, asyncio.run,
+                          server_ctx.astep(None))
+
+    def test_wrapped_method_signatures(self):
+        # the deferred error wrappers preserve the wrapped signatures
+        params = inspect.signature(gssctx.SecurityContext.wrap).parameters
+        self.assertEqual(list(params), ['self', 'message', 'encrypt'])
+
+        client_ctx = self._create_client_ctx()
+        self.assertEqual(list(inspect.signature(client_ctx.step).parameters),
+                         ['token'])
+        self.assertEqual(
+            list(inspect.signature(client_ctx.astep).parameters),
+            ['token', 'executor'])
+        self.assertEqual(gssctx.SecurityContext.wrap.__name__, 'wrap')
+
+    @ktu.gssapi_extension_test('cred_store', 'credentials store')
+    def test_acceptor_pool(self):
+        pool = gssctx.AcceptorPool(keytab=self.realm.keytab,
+                                   check_interval=0)
+        creds = pool.credentials
+        self.assertIsInstance(creds, gsscreds.Credentials)
+        self.assertIs(pool.credentials, creds)
+
+        client_ctx = self._create_client_ctx()
+        server_ctx = pool.new_context()
+        self.assertEqual(server_ctx.usage, 'accept')
+        client_ctx.step(server_ctx.step(client_ctx.step()))
+        self.assertTrue(server_ctx.complete)
+
+        # a change to the keytab means new credentials
+        mtime = os.stat(self.realm.keytab).st_mtime
+        os.utime(self.realm.keytab, (mtime + 10, mtime + 10))
+        self.assertIsNot(pool.credentials, creds)
+
+    def test_acceptor_pool_default_keytab(self):
+        # the default keytab comes from KRB5_KTNAME, without a credential store
+        pool = gssctx.AcceptorPool(check_interval=0)
+        self.assertIsNone(pool.store)
+        creds = pool.credentials
+        self.assertIsInstance(creds, gsscreds.Credentials)
+
+        client_ctx = self._create_client_ctx()
+        server_ctx = pool.new_context()
+        client_ctx.step(server_ctx.step(client_ctx.step()))
+        self.assertTrue(server_ctx.complete)
+
+        # k5test names the keytab with KRB5_KTNAME, so it is watched
+        self.assertIsNotNone(pool._keytab_path)
+        mtime = os.stat(pool._keytab_path).st_mtime
+        os.utime(pool._keytab_path, (mtime + 10, mtime + 10))
+        self.assertIsNot(pool.credentials, creds)
+
+    @ktu.gssapi_extension_test('cred_store', 'credentials store')
+    def test_wsgi_negotiate_middleware(self):
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [environ['REMOTE_USER'].encode('utf-8')]
+
+        middleware = gsshttp.WSGINegotiateMiddleware(
+            app, gssctx.AcceptorPool(keytab=self.realm.keytab),
+            secret=b'some secret')
+
+        def request(headers):
+            environ = {'HTTP_' + name.upper(): value
+                       for name, value in headers.items()}
+            response = {}
+
+            def start_response(status, headers, exc_info=None):
+                response['status'] = status
+                response['headers'] = headers
+
+            body = b''.join(middleware(environ, start_response))
+            return response['status'], dict(response['headers']), body
+
+        status, headers, body = request({})
+        self.assertEqual(status, '401 Unauthorized')
+        self.assertEqual(headers['WWW-Authenticate'], 'Negotiate')
+
+        flags = [gb.RequirementFlag.mutual_authentication]
+        client_ctx = self._create_client_ctx(flags=flags)
+        token = base64.b64encode(client_ctx.step()).decode('ascii')
+        status, headers, body = request(
+            {'authorization': 'Negotiate ' + token})
+        self.assertEqual(status, '200 OK')
+
+        # the mutual authentication token completes the client side
+        scheme, _, server_token = headers['WWW-Authenticate'].partition(' ')
+        self.assertEqual(scheme, 'Negotiate')
+        client_ctx.step(base64.b64decode(server_token))
+        self.assertTrue(client_ctx.complete)
+
+        user = str(client_ctx.initiator_name).encode('utf-8')
+        self.assertEqual(body, user)
+
+        # the session cookie is enough on its own from now on
+        cookie = headers['Set-Cookie'].split(';')[0]
+        status, headers, body = request({'cookie': cookie})
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(body, user)
+
+        status, headers, body = request({'cookie': cookie + 'x'})
+        self.assertEqual(status, '401 Unauthorized')
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    @ktu.gssapi_extension_test('cred_store', 'credentials store')
+    def test_negotiate_auth(self):
+        seen_users = []
+
+        def app(environ, start_response):
+            seen_users.append(environ['REMOTE_USER'])
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'ok']
+
+        middleware = gsshttp.WSGINegotiateMiddleware(
+            app, gssctx.AcceptorPool(keytab=self.realm.keytab),
+            secure_cookie=False)
+
+        negotiate = gsshttp.NegotiateAuth(
+            service=TARGET_SERVICE_NAME.decode('utf-8'))
+        host = FQDN.decode('utf-8')
+        self.assertIs(negotiate.target_name(host),
+                      negotiate.target_name(host))
+
+        with httpx.Client(transport=httpx.WSGITransport(app=middleware),
+                          auth=negotiate.httpx_auth()) as client:
+            response = client.get(f'http://{host}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, 'ok')
+
+            # the session cookie means no more handshakes
+            response = client.get(f'http://{host}/')
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(seen_users), 2)
+
+        context, header = negotiate.start(host)
+        self.assertTrue(header.startswith('Negotiate '))
+        self.assertRaises(excs.MutualAuthenticationError, negotiate.finish,
+                          context, host, None)
+
+    @ktu.gssapi_extension_test('cred_store', 'credentials store')
+    def test_negotiate_auth_requests_hook(self):
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'ok']
+
+        middleware = gsshttp.WSGINegotiateMiddleware(
+            app, gssctx.AcceptorPool(keytab=self.realm.keytab),
+            secure_cookie=False)
+        host = FQDN.decode('utf-8')
+
+        # just enough of requests to drive the response hook
+        class FakeRequest:
+            def __init__(self, headers):
+                self.headers = headers
+
+            def copy(self):
+                return FakeRequest(dict(self.headers))
+
+        class FakeConnection:
+            # (status, headers) to send for authenticated requests instead
+            # of the application's response
+            failure = None
+
+            def send(self, request, **kwargs):
+                environ = {'HTTP_' + name.upper(): value
+                           for name, value in request.headers.items()}
+                result = {}
+
+                def start_response(status, headers, exc_info=None):
+                    result['status'] = int(status.split()[0])
+                    result['headers'] = dict(headers)
+
+                body = b''.join(middleware(environ, start_response))
+                if (self.failure is not None and
+                        'Authorization' in request.headers):
+                    result['status'], result['headers'] = self.failure
+
+                return mock.Mock(status_code=result['status'],
+                                 headers=result['headers'],
+                                 url=f'http://{host}/', content=body,
+                                 request=request, history=[],
+                                 connection=self)
+
+        negotiate = gsshttp.NegotiateAuth(
+            service=TARGET_SERVICE_NAME.decode('utf-8'))
+
+        request = mock.Mock()
+        self.assertIs(negotiate(request), request)
+        request.register_hook.assert_called_once_with(
+            'response', negotiate.handle_response)
+
+        connection = FakeConnection()
+        response = connection.send(FakeRequest({}))
+        self.assertEqual(response.status_code, 401)
+
+        with mock.patch.object(negotiate, 'finish',
+                               wraps=negotiate.finish) as finish:
+            new_response = negotiate.handle_response(response)
+        self.assertEqual(new_response.status_code, 200)
+        self.assertEqual(new_response.history, [response])
+        self.assertTrue(new_response.request.headers['Authorization']
+                        .startswith('Negotiate '))
+        self.assertNotIn('Authorization', response.request.headers)
+        response.raw.release_conn.assert_called_once_with()
+
+        # the server's final token completed the context
+        finish.assert_called_once()
+        context = finish.call_args[0][0]
+        self.assertTrue(context.complete)
+
+        # successful responses are passed through
+        self.assertIs(negotiate.handle_response(new_response), new_response)
+
+        # a 401 despite our token means authentication failed
+        failed = connection.send(
+            FakeRequest({'Authorization': 'Negotiate eA=='}))
+        self.assertEqual(failed.status_code, 401)
+        self.assertIs(negotiate.handle_response(failed), failed)
+
+        # other errors are returned as they are, even though they don't
+        # carry a final token for mutual authentication
+        connection.failure = (403, {})
+        response = connection.send(FakeRequest({}))
+        with mock.patch.object(negotiate, 'finish') as finish:
+            forbidden = negotiate.handle_response(response)
+        self.assertEqual(forbidden.status_code, 403)
+        finish.assert_not_called()
+
+    def test_step_may_block(self):
+        client_ctx = self._create_client_ctx()
+        server_ctx = gssctx.SecurityContext(creds=self.server_creds)
+
+        self.assertTrue(client_ctx.step_may_block)
+        self.assertFalse(server_ctx.step_may_block)
+
+        client_token = client_ctx.step()
+        self.assertFalse(client_ctx.step_may_block)
+        self.assertFalse(server_ctx.step_may_block)
+
+        server_ctx.step(client_token)
+        self.assertFalse(server_ctx.step_may_block)
+
+    def test_astep(self):
+        client_ctx = self._create_client_ctx()
+        server_ctx = gssctx.SecurityContext(creds=self.server_creds)
+
+        async def run():
+            server_token = await server_ctx.astep(await client_ctx.astep())
+            await client_ctx.astep(server_token)
+
+        asyncio.run(run())
+
+        self.assertTrue(client_ctx.complete)
+        self.assertTrue(server_ctx.complete)
+
+    def test_aio_echo(self):
+        flags = [gb.RequirementFlag.mutual_authentication,
+                 gb.RequirementFlag.confidentiality]
+        client_ctx = self._create_client_ctx(flags=flags)
+        server_ctxs = []
+
+        def new_server_ctx():
+            ctx = gssctx.SecurityContext(creds=self.server_creds)
+            server_ctxs.append(ctx)
+            return ctx
+
+        class EchoProtocol(asyncio.Protocol):
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def data_received(self, data):
+                self.transport.write(data)
+
+        class ClientProtocol(asyncio.Protocol):
+            def __init__(self):
+                self.received = b''
+                self.done = asyncio.get_running_loop().create_future()
+
+            def data_received(self, data):
+                self.received += data
+                if len(self.received) >= 20:
+                    self.done.set_result(self.received)
+
+        async def run():
+            server = await gssaio.create_server(
+                EchoProtocol, '127.0.0.1', 0, context_factory=new_server_ctx)
+            port = server.sockets[0].getsockname()[1]
+
+            transport, protocol = await gssaio.create_connection(
+                ClientProtocol, '127.0.0.1', port, context=client_ctx)
+            try:
+                self.assertIs(transport.get_extra_info('security_context'),
+                              client_ctx)
+
+                transport.write(b'some message')
+                transport.write(b' and more')
+                return await asyncio.wait_for(protocol.done, 10)
+            finally:
+                transport.close()
+                server.close()
+                await server.wait_closed()
+
+        self.assertEqual(asyncio.run(run()), b'some message and more')
+        self.assertTrue(client_ctx.complete)
+        self.assertTrue(server_ctxs[0].complete)
+
+    def test_parallel_wrap_unwrap(self):
+        flags = [gb.RequirementFlag.mutual_authentication,
+                 gb.RequirementFlag.confidentiality]
+        client_ctx = self._create_client_ctx(flags=flags)
+        server_ctx = gssctx.SecurityContext(creds=self.server_creds)
+        client_ctx.step(server_ctx.step(client_ctx.step()))
+
+        messages = [str(i).encode('utf-8') for i in range(200)]
+        with gssparallel.ParallelWrapper(client_ctx, workers=4) as wrapper:
+            wrapped = wrapper.wrap(messages)
+            self.assertEqual(len(wrapped), len(messages))
+            for res in wrapped:
+                self.assertIsInstance(res, gb.WrapResult)
+
+        with gssparallel.ParallelWrapper(server_ctx, workers=4,
+                                         batch_size=16) as wrapper:
+            unwrapped = list(wrapper.unwrap_stream(
+                res.message for res in wrapped))
+            self.assertEqual([res.message for res in unwrapped], messages)
+
+    def test_parallel_serializes_context_use(self):
+        flags = [gb.RequirementFlag.mutual_authentication,
+                 gb.RequirementFlag.confidentiality]
+        client_ctx = self._create_client_ctx(flags=flags)
+        server_ctx = gssctx.SecurityContext(creds=self.server_creds)
+        client_ctx.step(server_ctx.step(client_ctx.step()))
+
+        active = []
+        max_active = []
+        lock = threading.Lock()
+
+        def wrap_many(context, messages, confidential=True):
+            with lock:
+                active.append(None)
+                max_active.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.pop()
+            return [gb.WrapResult(message, confidential)
+                    for message in messages]
+
+        messages = [str(i).encode('utf-8') for i in range(64)]
+        with mock.patch.object(gssparallel.rmessage, 'wrap_many',
+                               wrap_many):
+            # several workers, but only one batch at a time on the context
+            with gssparallel.ParallelWrapper(client_ctx, workers=4,
+                                             batch_size=4) as wrapper:
+                self.assertEqual(wrapper.workers, 4)
+                wrapped = list(wrapper.wrap_stream(messages))
+                self.assertEqual([res.message for res in wrapped], messages)
+                self.assertEqual(max(max_active), 1)
+
+        with gssparallel.ParallelWrapper(client_ctx) as wrapper:
+            self.assertEqual(wrapper.workers, 1)
+
+    def test_parallel_refuses_sequenced_context(self):
+        client_ctx, server_ctx = self._create_completed_contexts()
+
+        self.assertIn(gb.RequirementFlag.out_of_sequence_detection,
+                      client_ctx.actual_flags)
+        self.assertRaises(ValueError, gssparallel.ParallelWrapper,
+                          client_ctx)
@@ -5,6 +5,7 @@ import os
 import socket
 import sys
 import unittest
+from unittest import mock
 
 import gssapi.raw as gb
 import gssapi.raw.misc as gbmisc
@@ -87,6 +88,30 @@ class TestBaseUtilities(_GSSAPIKerberosTestCase):
         self.assertIsInstance(exported_name, bytes)
         self.assertGreater(len(exported_name), 0)
 
+    def test_canonicalize_export_names(self):
+        names = [gb.import_name(self.ADMIN_PRINC,
+                                gb.NameType.kerberos_principal),
+                 gb.import_name(TARGET_SERVICE_NAME,
+                                gb.NameType.hostbased_service)]
+
+        canonicalized_names = gb.canonicalize_names(names,
+                                                    gb.MechType.kerberos)
+        self.assertEqual(len(canonicalized_names), 2)
+        for name in canonicalized_names:
+            self.assertIsInstance(name, gb.Name)
+
+        exported_names = gb.export_names(canonicalized_names)
+        self.assertEqual(exported_names,
+                         [gb.export_name(name) for name in
+                          canonicalized_names])
+
+        # names which aren't mechanism names can't be exported
+        res = gb.export_names([names[1], canonicalized_names[1]])
+        self.assertIsInstance(res[0], gb.GSSError)
+        self.assertIsInstance(res[1], bytes)
+
+        self.assertRaises(TypeError, gb.export_names, [None])
+
     def test_duplicate_name(self):
         orig_name = gb.import_name(TARGET_SERVICE_NAME)
         new_name = gb.duplicate_name(orig_name)
@@ -189,6 +214,25 @@ class TestBaseUtilities(_GSSAPIKerberosTestCase):
         #     gb.exceptions.OperationUnavailableError, canon_name,
         #     'urn:greet:greeting')
 
+    @ktu.gssapi_extension_test('rfc6680', 'RFC 6680')
+    @ktu.krb_plugin_test('authdata', 'greet_client')
+    def test_get_name_attributes(self):
+        base_name = gb.import_name(TARGET_SERVICE_NAME,
+                                   gb.NameType.hostbased_service)
+        canon_name = gb.canonicalize_name(base_name, gb.MechType.kerberos)
+
+        gb.set_name_attribute(canon_name, b'urn:greet:greeting',
+                              [b'some val'], complete=True)
+
+        attrs = gb.get_name_attributes(canon_name)
+        self.assertIsInstance(attrs, dict)
+        self.assertIn(b'urn:greet:greeting', attrs)
+        self.assertEqual(attrs[b'urn:greet:greeting'],
+                         gb.get_name_attribute(canon_name,
+                                               b'urn:greet:greeting'))
+
+        self.assertEqual(gb.get_name_attributes(canon_name, []), {})
+
     @ktu.gssapi_extension_test('rfc6680', 'RFC 6680')
     @ktu.krb_plugin_test('authdata', 'greet_client')
     def test_import_export_name_composite(self):
@@ -553,6 +597,31 @@ class TestBaseUtilities(_GSSAPIKerberosTestCase):
         self.assertIsInstance(err, gb.NameReadError)
         self.assertEqual(err.maj_code, err_code1 | err_code2)
 
+        # the second lookup is served from the precomputed table
+        err = gb.GSSError(err_code1 | err_code2, 0)
+        self.assertIsInstance(err, gb.NameReadError)
+
+        # unregistered combinations fall back to the closest match
+        err_code3 = gb.DuplicateTokenError.SUPPLEMENTARY_CODE
+        err = gb.GSSError(err_code1 | err_code3, 0)
+        self.assertIsInstance(err, gb.ParameterReadError)
+
+    def test_error_message_is_lazy(self):
+        maj_code = gb.BadNameError.ROUTINE_CODE
+        with mock.patch.object(gb.GSSError, 'gen_message',
+                               return_value='some message') as gen_message:
+            err = gb.GSSError(maj_code, 0)
+            gen_message.assert_not_called()
+
+            self.assertEqual(str(err), 'some message')
+            self.assertEqual(err.args, ('some message',))
+            gen_message.assert_called_once_with()
+
+        err = gb.GSSError(maj_code, 0)
+        self.assertEqual(err.get_all_statuses(maj_code, True),
+                         err.get_all_statuses(maj_code, True))
+        self.assertIn((maj_code, True, None), gbmisc._status_strings)
+
     def test_inquire_names_for_mech(self):
         res = gb.inquire_names_for_mech(gb.MechType.kerberos)
         self.assertIsNotNone(res)
@@ -1672,6 +1741,83 @@ class TestWrapUnwrap(_GSSAPIKerberosTestCase):
         self.assertIsInstance(qop, int)
         self.assertGreaterEqual(qop, 0)
 
+    def test_wrap_unwrap_buffer_protocol(self):
+        message = bytearray(b"some larger test message")
+        wrapped_message, conf = gb.wrap(self.client_ctx,
+                                        memoryview(message)[5:])
+        self.assertIsInstance(wrapped_message, bytes)
+
+        unwrapped_message, conf, qop = gb.unwrap(
+            self.server_ctx, bytearray(wrapped_message))
+        self.assertEqual(unwrapped_message, b"larger test message")
+
+        mic_token = gb.get_mic(self.client_ctx, message)
+        gb.verify_mic(self.server_ctx, memoryview(message),
+                      bytearray(mic_token))
+
+        self.assertRaises(TypeError, gb.wrap, self.client_ctx, u"unicode")
+        self.assertRaises(BufferError, gb.wrap, self.client_ctx,
+                          memoryview(message)[::2])
+
+    def test_wrap_into_unwrap_into(self):
+        out = bytearray(256)
+        limit = gb.wrap_size_limit(self.client_ctx, len(out))
+        message = b"x" * limit
+
+        length, conf = gb.wrap_into(self.client_ctx, message, out)
+        self.assertIsInstance(length, int)
+        self.assertLessEqual(length, len(out))
+        self.assertTrue(conf)
+
+        plain = bytearray(length)
+        res = gb.unwrap_into(self.server_ctx, memoryview(out)[:length],
+                             plain)
+        self.assertIsInstance(res, gb.UnwrapIntoResult)
+        self.assertTrue(res.encrypted)
+        self.assertEqual(bytes(plain[:res.length]), message)
+
+    def test_wrap_into_too_small_raises_error(self):
+        self.assertRaises(ValueError, gb.wrap_into, self.client_ctx,
+                          b"test message", bytearray(4))
+
+        # the failed attempt didn't use up a sequence number
+        wrapped = gb.wrap(self.client_ctx, b"test message").message
+        res = gb.unwrap(self.server_ctx, wrapped)
+        self.assertEqual(res.message, b"test message")
+
+        self.assertRaises(BufferError, gb.wrap_into, self.client_ctx,
+                          b"test message", b"read-only output")
+
+    def test_wrap_many_unwrap_many(self):
+        messages = [b"test message", b"", b"other message"]
+        wrap_res = gb.wrap_many(self.client_ctx, messages)
+        self.assertIsInstance(wrap_res, list)
+        self.assertEqual(len(wrap_res), 3)
+        for res in wrap_res:
+            self.assertIsInstance(res, gb.WrapResult)
+            self.assertTrue(res.encrypted)
+
+        unwrap_res = gb.unwrap_many(self.server_ctx,
+                                    [res.message for res in wrap_res])
+        self.assertEqual(len(unwrap_res), 3)
+        for res, message in zip(unwrap_res, messages):
+            self.assertIsInstance(res, gb.UnwrapResult)
+            self.assertEqual(res.message, message)
+            self.assertTrue(res.encrypted)
+
+    def test_unwrap_many_returns_errors(self):
+        wrapped_message = gb.wrap(self.client_ctx, b"test message").message
+
+        res = gb.unwrap_many(self.server_ctx,
+                             [b"some invalid token", wrapped_message])
+        self.assertIsInstance(res[0], gb.GSSError)
+        # generated in this thread, in case the error is used elsewhere
+        self.assertTrue(res[0]._message_generated)
+        self.assertIsInstance(res[1], gb.UnwrapResult)
+        self.assertEqual(res[1].message, b"test message")
+
+        self.assertEqual(gb.unwrap_many(self.server_ctx, []), [])
+
     @ktu.gssapi_extension_test('dce', 'DCE (IOV/AEAD)')
     def test_basic_iov_wrap_unwrap_prealloc(self):
         init_data = b'some encrypted data'
@@ -1761,6 +1907,18 @@ class TestWrapUnwrap(_GSSAPIKerberosTestCase):
         self.assertIsInstance(qop, int)
         self.assertGreaterEqual(qop, 0)
 
+    @ktu.gssapi_extension_test('dce_aead', 'DCE (AEAD)')
+    @ktu.krb_provider_test(['mit'], 'unwrapping AEAD stream')
+    def test_aead_wrap_unwrap_buffer_protocol(self):
+        assoc_data = bytearray(b'some sig data')
+        wrapped_message, conf = gb.wrap_aead(
+            self.client_ctx, memoryview(b"test message"), assoc_data)
+
+        unwrapped_message, conf, qop = \
+            gb.unwrap_aead(self.server_ctx, bytearray(wrapped_message),
+                           memoryview(assoc_data))
+        self.assertEqual(unwrapped_message, b'test message')
+
     @ktu.gssapi_extension_test('dce_aead', 'DCE (AEAD)')
     @ktu.krb_provider_test(['mit'], 'unwrapping AEAD stream')
     def test_basic_aead_wrap_unwrap_no_assoc(self):
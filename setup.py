@@ -272,10 +272,6 @@ long_desc = re.sub(r'\.\. role:: \w+\(code\)\s*\n\s*.+', '',
                           re.sub(r'\.\. code-block:: \w+', '::',
                                  open('README.txt').read())))
 
-install_requires = [
-    'decorator',
-]
-
 setup(
     name='gssapi',
     version='1.10.1',
@@ -345,5 +341,4 @@ setup(
         extension_file('krb5', 'gss_krb5_ccache_name'),
     ]),
     keywords=['gssapi', 'security'],
-    install_requires=install_requires
 )